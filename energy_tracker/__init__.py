@@ -0,0 +1,57 @@
+"""Residential energy consumption tracker data structures.
+
+Submodules are imported lazily on first attribute access, so ``import
+energy_tracker`` is cheap and has no side effects.
+"""
+import importlib
+
+_EXPORTS = {
+    "Node": "linked_list",
+    "DoublyLinkedList": "linked_list",
+    "CircularQueue": "queues",
+    "Queue": "queues",
+    "BinaryTree": "binary_tree",
+    "TreeNode": "hierarchy",
+    "HierarchicalTree": "hierarchy",
+    "Priority": "tracking",
+    "EnergyReading": "tracking",
+    "ProcessingTask": "tracking",
+    "EnergyProcessingQueue": "tracking",
+    "SelectionSortManager": "tracking",
+    "EnergyHierarchyTree": "tracking",
+    "EnergyConsumptionList": "tracking",
+    "CircularEnergyQueue": "tracking",
+    "EnergyTrackingSystem": "tracking",
+    "ShardedEnergyTrackingSystem": "sharding",
+    "SharedEnergyRingBuffer": "shared_ring",
+    "WriteAheadLog": "wal",
+    "TaskHandlerRegistry": "handlers",
+    "task_handlers": "handlers",
+    "QueryCache": "query_cache",
+    "ReadingColumns": "analytics",
+    "ForecastEngine": "forecasting",
+    "ReorderBuffer": "reorder",
+    "DuplicateFilter": "dedup",
+    "CompressedHistory": "compression",
+    "RuleEngine": "rules",
+    "ThresholdRule": "rules",
+    "Goal": "rules",
+    "SystemSnapshot": "concurrency",
+    "ReadWriteLock": "concurrency",
+    "MeterFleet": "loadgen",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,235 @@
+"""Columnar reading history with vectorised group-by aggregates.
+
+Readings are stored as parallel typed arrays (timestamps, consumption and
+dictionary-encoded device, zone and reading type), so totals per hour, day,
+month, device, zone or reading type are computed with NumPy ``bincount`` and
+sort-based reductions instead of Python loops. Without NumPy the same API
+falls back to a plain Python loop.
+
+Timestamps are stored as seconds since 1970-01-01 in the readings' own
+(naive, local) time, so hour/day/month buckets match the wall clock the meter
+reported.
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .tracking import EnergyReading
+
+EPOCH = datetime(1970, 1, 1)
+GROUP_KEYS = ("hour", "day", "month", "device", "zone", "reading_type")
+AGGREGATES = ("sum", "mean", "count", "min", "max", "percentile")
+
+
+def to_seconds(timestamp: datetime) -> float:
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None)
+    return (timestamp - EPOCH).total_seconds()
+
+
+class ReadingColumns:
+    def __init__(self):
+        self.timestamps = array("d")
+        self.consumption = array("d")
+        self.device_codes = array("i")
+        self.zone_codes = array("i")
+        self.type_codes = array("i")
+        self.devices: List[str] = []
+        self.zones: List[str] = []
+        self.reading_types: List[str] = []
+        self._device_index: Dict[str, int] = {}
+        self._zone_index: Dict[str, int] = {}
+        self._type_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @staticmethod
+    def _encode(value: str, values: List[str], index: Dict[str, int]) -> int:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def append(self, reading: EnergyReading, zone_name: str) -> None:
+        self.timestamps.append(to_seconds(reading.timestamp))
+        self.consumption.append(reading.consumption)
+        self.device_codes.append(self._encode(reading.device_id, self.devices, self._device_index))
+        self.zone_codes.append(self._encode(zone_name, self.zones, self._zone_index))
+        self.type_codes.append(self._encode(reading.reading_type, self.reading_types, self._type_index))
+
+    @classmethod
+    def from_system(cls, system) -> 'ReadingColumns':
+        """Build columns from the readings already stored in a system's zones."""
+        columns = cls()
+        for zone_name, node in system.hierarchy.node_map.items():
+            for reading in node.readings:
+                columns.append(reading, zone_name)
+        return columns
+
+    @classmethod
+    def from_codes(cls, timestamps: Sequence[float], consumption: Sequence[float],
+                   device_codes: Sequence[int], devices: List[str],
+                   zone_codes: Sequence[int], zones: List[str],
+                   type_codes: Sequence[int], reading_types: List[str]) -> 'ReadingColumns':
+        """Bulk-load already encoded columns, e.g. NumPy arrays from a generator or file.
+
+        Timestamps are seconds since 1970-01-01 in local time (see to_seconds).
+        """
+        columns = cls()
+        for name, typecode, values in (("timestamps", "d", timestamps), ("consumption", "d", consumption),
+                                       ("device_codes", "i", device_codes), ("zone_codes", "i", zone_codes),
+                                       ("type_codes", "i", type_codes)):
+            column = array(typecode)
+            if np is not None:
+                dtype = np.float64 if typecode == "d" else np.int32
+                column.frombytes(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            else:
+                column.extend(values)
+            setattr(columns, name, column)
+        for values, attribute, index in ((devices, "devices", "_device_index"), (zones, "zones", "_zone_index"),
+                                         (reading_types, "reading_types", "_type_index")):
+            setattr(columns, attribute, list(values))
+            setattr(columns, index, {value: code for code, value in enumerate(values)})
+        return columns
+
+    def group_by(self, by: str, agg: str = "sum", q: float = 50.0,
+                 start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[Hashable, float]:
+        """Aggregate consumption per group, ordered by group key.
+
+        ``by`` is one of hour, day, month, device, zone or reading_type and ``agg``
+        one of sum, mean, count, min, max or percentile (using ``q``, 0-100).
+        ``start``/``end`` restrict the readings to the half-open range [start, end).
+        """
+        if by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key '{by}', expected one of {GROUP_KEYS}")
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}', expected one of {AGGREGATES}")
+        if not len(self):
+            return {}
+        if np is None:
+            return self._group_by_python(by, agg, q, start, end)
+        return self._group_by_numpy(by, agg, q, start, end)
+
+    def _labels(self, by: str) -> Optional[List[str]]:
+        return {"device": self.devices, "zone": self.zones, "reading_type": self.reading_types}.get(by)
+
+    def _label(self, by: str, key: int) -> Hashable:
+        if by == "hour":
+            return EPOCH + timedelta(hours=key)
+        if by == "day":
+            return date(1970, 1, 1) + timedelta(days=key)
+        if by == "month":
+            return f"{1970 + key // 12:04d}-{key % 12 + 1:02d}"
+        return self._labels(by)[key]
+
+    def _group_by_numpy(self, by, agg, q, start, end) -> Dict[Hashable, float]:
+        # Zero-copy views of the arrays; they must not outlive this call, or the
+        # arrays could no longer grow.
+        timestamps = np.frombuffer(self.timestamps, dtype=np.float64)
+        values = np.frombuffer(self.consumption, dtype=np.float64)
+        if by in ("hour", "day", "month"):
+            # Integer division is several times faster than floor-dividing floats
+            seconds = np.floor(timestamps).astype(np.int64)
+            keys = seconds // (3600 if by == "hour" else 86400)
+            if by == "month":
+                # Map each distinct day to its month through a small lookup table
+                first_day = int(keys.min())
+                days = np.arange(first_day, int(keys.max()) + 1).astype("datetime64[D]")
+                keys = days.astype("datetime64[M]").astype(np.int64)[keys - first_day]
+        else:
+            codes = {"device": self.device_codes, "zone": self.zone_codes, "reading_type": self.type_codes}[by]
+            keys = np.frombuffer(codes, dtype=np.int32).astype(np.int64)
+
+        if start is not None or end is not None:
+            mask = np.ones(len(timestamps), dtype=bool)
+            if start is not None:
+                mask &= timestamps >= to_seconds(start)
+            if end is not None:
+                mask &= timestamps < to_seconds(end)
+            keys, values = keys[mask], values[mask]
+        if not len(keys):
+            return {}
+
+        offset = int(keys.min())
+        dense = keys - offset
+        counts = np.bincount(dense)
+        present = np.flatnonzero(counts)
+        if agg == "count":
+            result = counts[present].astype(np.float64)
+        elif agg in ("sum", "mean"):
+            result = np.bincount(dense, weights=values)[present]
+            if agg == "mean":
+                result = result / counts[present]
+        elif agg in ("min", "max"):
+            result = np.full(len(counts), np.inf if agg == "min" else -np.inf)
+            (np.minimum if agg == "min" else np.maximum).at(result, dense, values)
+            result = result[present]
+        else:
+            # Stable sort on the narrowest key type lets NumPy use a radix sort; each
+            # group is then one contiguous run handed to np.percentile.
+            key_type = np.uint16 if len(counts) <= 1 << 16 else np.int64
+            grouped = values[np.argsort(dense.astype(key_type), kind="stable")]
+            group_counts = counts[present]
+            starts = np.cumsum(group_counts) - group_counts
+            result = [np.percentile(grouped[first:first + count], q)
+                      for first, count in zip(starts, group_counts)]
+
+        return {self._label(by, int(key) + offset): float(value) for key, value in zip(present, result)}
+
+    def _group_by_python(self, by, agg, q, start, end) -> Dict[Hashable, float]:
+        low = to_seconds(start) if start is not None else float("-inf")
+        high = to_seconds(end) if end is not None else float("inf")
+        codes = {"device": self.device_codes, "zone": self.zone_codes, "reading_type": self.type_codes}.get(by)
+        groups: Dict[int, List[float]] = {}
+        for i, (timestamp, value) in enumerate(zip(self.timestamps, self.consumption)):
+            if not low <= timestamp < high:
+                continue
+            if by == "hour":
+                key = int(timestamp // 3600)
+            elif by == "day":
+                key = int(timestamp // 86400)
+            elif by == "month":
+                moment = EPOCH + timedelta(seconds=timestamp)
+                key = (moment.year - 1970) * 12 + moment.month - 1
+            else:
+                key = codes[i]
+            groups.setdefault(key, []).append(value)
+
+        result = {}
+        for key in sorted(groups):
+            group = groups[key]
+            if agg == "sum":
+                value = sum(group)
+            elif agg == "mean":
+                value = sum(group) / len(group)
+            elif agg == "count":
+                value = float(len(group))
+            elif agg == "min":
+                value = min(group)
+            elif agg == "max":
+                value = max(group)
+            else:
+                group.sort()
+                position = (q / 100.0) * (len(group) - 1)
+                lower = int(position)
+                upper = min(lower + 1, len(group) - 1)
+                value = group[lower] + (group[upper] - group[lower]) * (position - lower)
+            result[self._label(by, key)] = value
+        return result
+
+
+def group_by(readings: Iterable[EnergyReading], by: str, agg: str = "sum", zone_name: str = "",
+             **options) -> Dict[Hashable, float]:
+    """One-off group-by over any iterable of readings."""
+    columns = ReadingColumns()
+    for reading in readings:
+        columns.append(reading, zone_name)
+    return columns.group_by(by, agg, **options)
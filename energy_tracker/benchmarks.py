@@ -0,0 +1,447 @@
+"""Offline benchmark suite for the energy tracker data structures.
+
+Run with e.g. ``python -m energy_tracker.benchmarks --max-size 100000 --output results.json``.
+Pass ``--baseline baseline.json`` to compare against a stored run; the process
+exits with status 1 when any benchmark is slower than the baseline by more than
+the tolerance. ``--save-baseline`` writes the current run as the new baseline.
+
+Like ``timeit``'s autorange, each timing repeats the run phase on fresh setups
+until it has taken at least ``--min-time`` seconds and reports the mean, so
+sub-millisecond runs are not dominated by timer and scheduler noise. Slowdowns
+smaller than ``--floor`` seconds are never reported, whatever their ratio.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
+
+from .analytics import ReadingColumns
+from .binary_tree import BinaryTree
+from .hierarchy import HierarchicalTree, TreeNode
+from .linked_list import DoublyLinkedList
+from .queues import CircularQueue, Queue
+from .tracking import EnergyReading, EnergyTrackingSystem, Priority, SelectionSortManager
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+ALL_SIZES = [10 ** exponent for exponent in range(3, 8)]
+IMPORT_MODULES = ["energy_tracker", "energy_tracker.linked_list", "energy_tracker.queues",
+                  "energy_tracker.binary_tree", "energy_tracker.hierarchy", "energy_tracker.tracking"]
+START = datetime(2025, 1, 1)
+
+
+class Benchmark(NamedTuple):
+    structure: str
+    operation: str
+    setup: Callable[[int, random.Random], object]
+    run: Callable[[object], None]
+    # Quadratic or memory-heavy operations are skipped above this size
+    max_size: Optional[int] = None
+
+
+def meter_readings(n: int, rng: random.Random, devices: int = 100) -> List[dict]:
+    """Synthetic minute-level meter data in the dict shape used by the topic demos."""
+    return [
+        {
+            "timestamp": START + timedelta(minutes=i),
+            "date": (START + timedelta(minutes=i)).strftime("%Y-%m-%d"),
+            "device_id": f"device_{rng.randrange(devices)}",
+            "consumption": rng.uniform(0.05, 3.0),
+        }
+        for i in range(n)
+    ]
+
+
+def energy_readings(n: int, rng: random.Random) -> List[EnergyReading]:
+    return [
+        EnergyReading(
+            timestamp=data["timestamp"],
+            consumption=data["consumption"],
+            device_id=data["device_id"],
+            reading_type="peak" if 7 <= data["timestamp"].hour < 23 else "off-peak",
+            priority=rng.choice(list(Priority)),
+        )
+        for data in meter_readings(n, rng)
+    ]
+
+
+def _filled_list(n: int, rng: random.Random) -> DoublyLinkedList:
+    logs = DoublyLinkedList()
+    for data in meter_readings(n, rng):
+        logs.append(data)
+    return logs
+
+
+def _fill_list(state) -> None:
+    logs, values = state
+    for data in values:
+        logs.append(data)
+
+
+def _list_range_query(logs: DoublyLinkedList) -> None:
+    low, high = START + timedelta(hours=1), START + timedelta(hours=2)
+    current = logs.head
+    matches = []
+    while current:
+        if low <= current.data["timestamp"] < high:
+            matches.append(current.data)
+        current = current.next
+
+
+def _list_remove(state) -> None:
+    logs, targets = state
+    for data in targets:
+        logs.remove(data)
+
+
+def _setup_list_remove(n: int, rng: random.Random):
+    logs = _filled_list(n, rng)
+    targets = rng.sample(logs.to_list(), min(n, 100))
+    return logs, targets
+
+
+def _fill_circular(state) -> None:
+    queue, values = state
+    for value in values:
+        queue.enqueue(value)
+
+
+def _drain_circular(queue: CircularQueue) -> None:
+    while queue.front != -1:
+        queue.dequeue()
+
+
+def _setup_drain_circular(n: int, rng: random.Random) -> CircularQueue:
+    queue = CircularQueue(n)
+    for data in meter_readings(n, rng):
+        queue.enqueue(data["consumption"])
+    return queue
+
+
+def _fill_queue(state) -> None:
+    queue, values = state
+    for value in values:
+        queue.enqueue(value)
+
+
+def _drain_queue(queue: Queue) -> None:
+    while not queue.is_empty():
+        queue.dequeue()
+
+
+def _setup_drain_queue(n: int, rng: random.Random) -> Queue:
+    queue = Queue()
+    for data in meter_readings(n, rng):
+        queue.enqueue(data["consumption"])
+    return queue
+
+
+def _fill_tree(state) -> None:
+    tree, values = state
+    for value in values:
+        tree.insert(value)
+
+
+def _setup_tree_traversal(n: int, rng: random.Random) -> BinaryTree:
+    tree = BinaryTree()
+    _fill_tree((tree, [data["consumption"] for data in meter_readings(n, rng)]))
+    return tree
+
+
+def _traverse_binary_tree(tree: BinaryTree) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tree.inorder_traversal()
+
+
+def _setup_hierarchy(n: int, rng: random.Random) -> HierarchicalTree:
+    """Building -> 10 floors -> 10 rooms -> readings."""
+    tree = HierarchicalTree("Building")
+    rooms = []
+    for floor_number in range(10):
+        floor = TreeNode(f"Floor {floor_number}")
+        tree.root.add_child(floor)
+        for room_number in range(10):
+            room = TreeNode(f"Room {floor_number}{room_number:02d}")
+            floor.add_child(room)
+            rooms.append(room)
+    for i, data in enumerate(meter_readings(n, rng)):
+        rooms[i % len(rooms)].add_child(TreeNode(data["consumption"]))
+    return tree
+
+
+def _ingest_hierarchy(state) -> None:
+    tree, values = state
+    floor = TreeNode("Floor")
+    tree.root.add_child(floor)
+    for value in values:
+        floor.add_child(TreeNode(value))
+
+
+def _traverse_hierarchy(tree: HierarchicalTree) -> None:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        tree.root.display()
+
+
+def _new_system() -> EnergyTrackingSystem:
+    system = EnergyTrackingSystem()
+    for floor_number in range(10):
+        system.hierarchy.add_zone(f"Floor {floor_number}", "Building")
+        for room_number in range(10):
+            system.hierarchy.add_zone(f"Room {floor_number}{room_number:02d}", f"Floor {floor_number}")
+    return system
+
+
+def _zone_for(i: int) -> str:
+    return f"Room {(i // 10) % 10}{i % 10:02d}"
+
+
+def _ingest_system(state) -> None:
+    system, readings = state
+    for i, reading in enumerate(readings):
+        system.add_reading(reading, _zone_for(i))
+
+
+def _setup_filled_system(n: int, rng: random.Random) -> EnergyTrackingSystem:
+    system = _new_system()
+    _ingest_system((system, energy_readings(n, rng)))
+    return system
+
+
+def _system_range_query(system: EnergyTrackingSystem) -> None:
+    low, high = START + timedelta(hours=1), START + timedelta(hours=2)
+    current = system.history.head
+    matches = []
+    while current:
+        if low <= current.reading.timestamp < high:
+            matches.append(current.reading)
+        current = current.next
+
+
+def _sort_list(logs: DoublyLinkedList) -> None:
+    logs.selection_sort(key=lambda data: data["consumption"])
+
+
+def _sort_readings(readings: List[EnergyReading]) -> None:
+    SelectionSortManager.selection_sort_readings(readings)
+
+
+def _setup_columns(n: int, rng: random.Random) -> ReadingColumns:
+    columns = ReadingColumns()
+    for i, reading in enumerate(energy_readings(n, rng)):
+        columns.append(reading, _zone_for(i))
+    return columns
+
+
+BENCHMARKS = [
+    Benchmark("DoublyLinkedList", "ingest",
+              lambda n, rng: (DoublyLinkedList(), meter_readings(n, rng)),
+              _fill_list),
+    # Both sorts are selection sorts, so they are only run at the smallest size
+    Benchmark("DoublyLinkedList", "sort", _filled_list, _sort_list, max_size=10 ** 3),
+    Benchmark("DoublyLinkedList", "remove", _setup_list_remove, _list_remove, max_size=10 ** 6),
+    Benchmark("DoublyLinkedList", "range_query", _filled_list, _list_range_query),
+    Benchmark("CircularQueue", "ingest",
+              lambda n, rng: (CircularQueue(n + 1), [d["consumption"] for d in meter_readings(n, rng)]),
+              _fill_circular),
+    Benchmark("CircularQueue", "dequeue", _setup_drain_circular, _drain_circular),
+    Benchmark("Queue", "ingest",
+              lambda n, rng: (Queue(), [d["consumption"] for d in meter_readings(n, rng)]),
+              _fill_queue),
+    # Queue.dequeue pops from the front of a Python list, so draining is quadratic
+    Benchmark("Queue", "dequeue", _setup_drain_queue, _drain_queue, max_size=10 ** 5),
+    Benchmark("BinaryTree", "ingest",
+              lambda n, rng: (BinaryTree(), [d["consumption"] for d in meter_readings(n, rng)]),
+              _fill_tree, max_size=10 ** 6),
+    Benchmark("BinaryTree", "traversal", _setup_tree_traversal, _traverse_binary_tree, max_size=10 ** 6),
+    Benchmark("HierarchicalTree", "ingest",
+              lambda n, rng: (HierarchicalTree("Building"), [d["consumption"] for d in meter_readings(n, rng)]),
+              _ingest_hierarchy),
+    Benchmark("HierarchicalTree", "traversal", _setup_hierarchy, _traverse_hierarchy),
+    Benchmark("EnergyTrackingSystem", "ingest",
+              lambda n, rng: (_new_system(), energy_readings(n, rng)),
+              _ingest_system, max_size=10 ** 6),
+    Benchmark("EnergyTrackingSystem", "process_all_pending", _setup_filled_system,
+              lambda system: system.process_all_pending(), max_size=10 ** 6),
+    Benchmark("EnergyTrackingSystem", "range_query", _setup_filled_system,
+              _system_range_query, max_size=10 ** 6),
+    Benchmark("EnergyTrackingSystem", "sort", energy_readings, _sort_readings, max_size=10 ** 3),
+    Benchmark("ReadingColumns", "group_by_day_sum", _setup_columns,
+              lambda columns: columns.group_by("day", "sum"), max_size=10 ** 6),
+    Benchmark("ReadingColumns", "group_by_device_p95", _setup_columns,
+              lambda columns: columns.group_by("device", "percentile", q=95), max_size=10 ** 6),
+]
+
+
+def time_benchmark(benchmark: Benchmark, n: int, repeat: int, seed: int, min_time: float = 0.2) -> float:
+    """Best of repeat timings of the run phase, each averaged over enough fresh setups to last min_time."""
+    best = float("inf")
+    for attempt in range(repeat):
+        total, loops = 0.0, 0
+        while loops == 0 or total < min_time:
+            state = benchmark.setup(n, random.Random(seed + attempt))
+            gc.collect()
+            gc.disable()
+            try:
+                started = time.perf_counter()
+                benchmark.run(state)
+                total += time.perf_counter() - started
+            finally:
+                gc.enable()
+            loops += 1
+            del state
+        best = min(best, total / loops)
+    return best
+
+
+def run_suite(sizes: List[int], repeat: int = 3, seed: int = 2025,
+              only: Optional[str] = None, verbose: bool = True, min_time: float = 0.2) -> dict:
+    """Run every benchmark at every size and return a JSON-serialisable report."""
+    results = {}
+    for benchmark in BENCHMARKS:
+        if only and only not in benchmark.structure:
+            continue
+        for n in sizes:
+            if benchmark.max_size is not None and n > benchmark.max_size:
+                continue
+            seconds = time_benchmark(benchmark, n, repeat, seed, min_time)
+            key = f"{benchmark.structure}.{benchmark.operation}[{n}]"
+            results[key] = {
+                "structure": benchmark.structure,
+                "operation": benchmark.operation,
+                "size": n,
+                "seconds": seconds,
+                "ops_per_sec": n / seconds if seconds else None,
+            }
+            if verbose:
+                print(f"{key:<50} {seconds * 1000:>12.3f} ms")
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "min_time": min_time,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def measure_import_time(module: str, repeat: int = 3) -> float:
+    """Best cumulative import time in seconds of a module in a fresh interpreter.
+
+    This is the cold-start cost: everything the import pulls in is counted,
+    standard library modules included.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = float("inf")
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=root, capture_output=True, text=True, check=True,
+        )
+        total_us = 0
+        for line in completed.stderr.splitlines():
+            fields = line.split("|")
+            # Top-level records (one space of indent) already include their nested imports
+            if len(fields) == 3 and fields[2].startswith(" energy_tracker"):
+                total_us += int(fields[1])
+        best = min(best, total_us / 1e6)
+    return best
+
+
+def run_import_suite(repeat: int = 3, verbose: bool = True) -> dict:
+    results = {}
+    for module in IMPORT_MODULES:
+        seconds = measure_import_time(module, repeat)
+        key = f"import.{module}"
+        results[key] = {"structure": module, "operation": "import", "size": 1,
+                        "seconds": seconds, "ops_per_sec": None}
+        if verbose:
+            print(f"{key:<50} {seconds * 1000:>12.3f} ms")
+    return results
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.2,
+                        floor: float = 0.0005) -> List[str]:
+    """Return a line per benchmark that is slower than the baseline beyond tolerance.
+
+    Slowdowns of less than ``floor`` seconds are ignored, since on very short
+    benchmarks they are within measurement noise.
+    """
+    regressions = []
+    for key, result in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous or not previous["seconds"]:
+            continue
+        if result["seconds"] - previous["seconds"] < floor:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{key}: {previous['seconds'] * 1000:.3f} ms -> "
+                f"{result['seconds'] * 1000:.3f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the energy tracker data structures.")
+    parser.add_argument("--sizes", type=int, nargs="+", help="input sizes to run (default 1e3..1e5)")
+    parser.add_argument("--max-size", type=int, help="run every power of ten from 1e3 up to this size")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=2025)
+    parser.add_argument("--only", help="only run structures whose name contains this text")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown before reporting a regression (0.2 = 20%%)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="repeat each timing on fresh setups until it has run this many seconds")
+    parser.add_argument("--floor", type=float, default=0.0005,
+                        help="ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = args.sizes
+    elif args.max_size:
+        sizes = [n for n in ALL_SIZES if n <= args.max_size]
+    else:
+        sizes = DEFAULT_SIZES
+
+    report = run_suite(sizes, repeat=args.repeat, seed=args.seed, only=args.only, min_time=args.min_time)
+    if not args.only or "import" in args.only:
+        report["results"].update(run_import_suite(args.repeat))
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if not args.baseline:
+        return 0
+    if args.save_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare_to_baseline(report, baseline, args.tolerance, args.floor)
+    if regressions:
+        print("\nPerformance regressions:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Binary search tree used for order management (topic 5)."""
+
+class TreeNode:
+    def __init__(self, data):
+        self.data = data
+        self.left = None
+        self.right = None
+
+class BinaryTree:
+    def __init__(self):
+        self.root = None
+
+    def insert(self, data):
+        if not self.root:
+            self.root = TreeNode(data)
+        else:
+            self._insert_recursive(self.root, data)
+
+    def _insert_recursive(self, node, data):
+        if data < node.data:
+            if node.left is None:
+                node.left = TreeNode(data)
+            else:
+                self._insert_recursive(node.left, data)
+        else:
+            if node.right is None:
+                node.right = TreeNode(data)
+            else:
+                self._insert_recursive(node.right, data)
+
+    def inorder_traversal(self):
+        def _inorder(node):
+            if node:
+                _inorder(node.left)
+                print(node.data, end=' ')
+                _inorder(node.right)
+        _inorder(self.root)
+        print()
+
+    def memory_report(self, sample=64):
+        """Node count and estimated deep size in bytes, measuring about sample nodes."""
+        from .memory import deep_sizeof, tree_sizeof
+        nodes, size = tree_sizeof(self.root, lambda node: [child for child in (node.left, node.right) if child],
+                                  sample=sample)
+        return {"nodes": nodes, "bytes": deep_sizeof(self, sample, stop=(TreeNode,)) + size}
@@ -0,0 +1,417 @@
+"""Gorilla-style compressed chunks for reading history.
+
+Each series (one device and reading type) is stored as sealed chunks of up to
+``chunk_size`` points. Timestamps are encoded as delta-of-delta, which costs a
+single bit for meters reporting on a fixed interval, and consumption values
+as the XOR with the previous value, which stays short while consumption
+changes slowly. Every chunk also keeps its count, sum, min, max and time span,
+so aggregates skip chunks outside a range and answer fully covered chunks
+without decoding them.
+
+Timestamps are stored as ticks of ``resolution`` (one second by default)
+since 1970-01-01 in the readings' own (naive, local) time, rounded down.
+Meters rarely report on exact microsecond boundaries, so at microsecond
+resolution any sub-second jitter costs extra delta-of-delta bits; pass a
+finer resolution only when sub-second timestamps matter. Range bounds are
+rounded down the same way. Priority is not stored; decoded readings get the
+default.
+
+``EnergyTrackingSystem(compressed_history=True)`` uses this as its history:
+readings stay in the raw linked list only until their chunk is sealed.
+"""
+
+import struct
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .tracking import EnergyReading
+
+EPOCH = datetime(1970, 1, 1)
+MAGIC = b"ETGC"
+VERSION = 2  # version 1 had no resolution field and stored microseconds
+# count, min/max timestamp, first timestamp (in ticks), first value bits, sum, min, max, payload bytes
+CHUNK_HEADER = struct.Struct("<IqqqQdddI")
+_DOUBLE = struct.Struct("<d")
+_UINT64 = struct.Struct("<Q")
+MASK64 = (1 << 64) - 1
+
+# Delta-of-delta buckets: (prefix, prefix bits, value bits)
+DOD_BUCKETS = ((0b10, 2, 7), (0b110, 3, 9), (0b1110, 4, 12))
+
+
+def to_micros(timestamp: datetime) -> int:
+    return (timestamp.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def float_bits(value: float) -> int:
+    return _UINT64.unpack(_DOUBLE.pack(value))[0]
+
+
+def bits_float(bits: int) -> float:
+    return _DOUBLE.unpack(_UINT64.pack(bits))[0]
+
+
+class BitWriter:
+    __slots__ = ("data", "acc", "nbits")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.acc = 0
+        self.nbits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        self.acc = (self.acc << nbits) | value
+        self.nbits += nbits
+        if self.nbits >= 64:
+            spare = self.nbits & 7
+            self.data += (self.acc >> spare).to_bytes(self.nbits >> 3, "big")
+            self.acc &= (1 << spare) - 1
+            self.nbits = spare
+
+    def getvalue(self) -> bytes:
+        """Bytes written so far, with the last byte zero-padded."""
+        if not self.nbits:
+            return bytes(self.data)
+        padding = -self.nbits & 7
+        return bytes(self.data) + (self.acc << padding).to_bytes((self.nbits + padding) >> 3, "big")
+
+    def bit_length(self) -> int:
+        return len(self.data) * 8 + self.nbits
+
+
+class BitReader:
+    __slots__ = ("data", "position", "acc", "nbits")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.position = 0
+        self.acc = 0
+        self.nbits = 0
+
+    def read(self, nbits: int) -> int:
+        while self.nbits < nbits:
+            # Past the end reads as zero padding
+            chunk = self.data[self.position:self.position + 8]
+            self.position += 8
+            self.acc = (self.acc << 64) | int.from_bytes(chunk.ljust(8, b"\0"), "big")
+            self.nbits += 64
+        self.nbits -= nbits
+        value = self.acc >> self.nbits
+        self.acc &= (1 << self.nbits) - 1
+        return value
+
+
+class Chunk:
+    """A sealed, immutable block of encoded points plus its summary."""
+
+    __slots__ = ("count", "min_time", "max_time", "first_time", "first_bits", "total", "minimum", "maximum",
+                 "payload")
+
+    def __init__(self, count: int, min_time: int, max_time: int, first_time: int, first_bits: int,
+                 total: float, minimum: float, maximum: float, payload: bytes):
+        self.count = count
+        self.min_time = min_time
+        self.max_time = max_time
+        self.first_time = first_time
+        self.first_bits = first_bits
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+        self.payload = payload
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        """Stream (timestamp, value) pairs in insertion order."""
+        reader = BitReader(self.payload)
+        read = reader.read
+        timestamp, bits = self.first_time, self.first_bits
+        yield timestamp, bits_float(bits)
+        delta = 0
+        leading = trailing = 0
+        for _ in range(self.count - 1):
+            if read(1):
+                # One more 1-bit per larger bucket: 10, 110, 1110, then 1111 for a full 64 bits
+                for _, _, value_bits in DOD_BUCKETS:
+                    if not read(1):
+                        break
+                else:
+                    value_bits = 64
+                if value_bits == 64:
+                    dod = read(64)
+                    dod = dod - (1 << 64) if dod >> 63 else dod
+                else:
+                    dod = read(value_bits) - (1 << (value_bits - 1)) + 1
+                delta += dod
+            timestamp += delta
+
+            if read(1):
+                if read(1):
+                    leading = read(5)
+                    significant = read(6) + 1
+                    trailing = 64 - leading - significant
+                bits ^= read(64 - leading - trailing) << trailing
+            yield timestamp, bits_float(bits)
+
+    def nbytes(self) -> int:
+        return CHUNK_HEADER.size + len(self.payload)
+
+
+class ChunkEncoder:
+    """Open chunk that points are appended to until it is sealed."""
+
+    def __init__(self):
+        self.writer = BitWriter()
+        self.count = 0
+        self.first_time = self.previous_time = 0
+        self.first_bits = self.previous_bits = 0
+        self.delta = 0
+        self.leading = self.trailing = -1
+        self.min_time = self.max_time = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def append(self, timestamp: int, value: float) -> None:
+        bits = float_bits(value)
+        if self.count == 0:
+            self.first_time = self.min_time = self.max_time = timestamp
+            self.first_bits = bits
+        else:
+            self._write_timestamp(timestamp)
+            self._write_value(bits)
+            self.min_time = min(self.min_time, timestamp)
+            self.max_time = max(self.max_time, timestamp)
+        self.previous_time = timestamp
+        self.previous_bits = bits
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def _write_timestamp(self, timestamp: int) -> None:
+        write = self.writer.write
+        delta = timestamp - self.previous_time
+        dod = delta - self.delta
+        self.delta = delta
+        if dod == 0:
+            write(0, 1)
+            return
+        for prefix, prefix_bits, value_bits in DOD_BUCKETS:
+            if -(1 << (value_bits - 1)) < dod <= 1 << (value_bits - 1):
+                write(prefix, prefix_bits)
+                write(dod + (1 << (value_bits - 1)) - 1, value_bits)
+                return
+        write(0b1111, 4)
+        write(dod & MASK64, 64)
+
+    def _write_value(self, bits: int) -> None:
+        write = self.writer.write
+        xor = bits ^ self.previous_bits
+        if xor == 0:
+            write(0, 1)
+            return
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+        if self.leading >= 0 and leading >= self.leading and trailing >= self.trailing:
+            # Meaningful bits fit inside the previous window
+            write(0b10, 2)
+            write(xor >> self.trailing, 64 - self.leading - self.trailing)
+        else:
+            significant = 64 - leading - trailing
+            write(0b11, 2)
+            write(leading, 5)
+            write(significant - 1, 6)
+            write(xor >> trailing, significant)
+            self.leading, self.trailing = leading, trailing
+
+    def seal(self) -> Chunk:
+        return Chunk(self.count, self.min_time, self.max_time, self.first_time, self.first_bits,
+                     self.total, self.minimum, self.maximum, self.writer.getvalue())
+
+    def nbytes(self) -> int:
+        return CHUNK_HEADER.size + (self.writer.bit_length() + 7) // 8
+
+
+class CompressedSeries:
+    def __init__(self, chunk_size: int = 1024):
+        self.chunk_size = chunk_size
+        self.chunks: List[Chunk] = []
+        self.open: Optional[ChunkEncoder] = None
+
+    def __len__(self) -> int:
+        return sum(chunk.count for chunk in self.chunks) + (self.open.count if self.open else 0)
+
+    def append(self, timestamp: int, value: float) -> bool:
+        """Add a point; True if this sealed the open chunk."""
+        if self.open is None:
+            self.open = ChunkEncoder()
+        self.open.append(timestamp, value)
+        if self.open.count >= self.chunk_size:
+            self.seal()
+            return True
+        return False
+
+    def seal(self) -> None:
+        """Close the open chunk, if any."""
+        if self.open is not None and self.open.count:
+            self.chunks.append(self.open.seal())
+        self.open = None
+
+    def _all_chunks(self, sealed_only: bool = False) -> List[Chunk]:
+        if not sealed_only and self.open is not None and self.open.count:
+            return self.chunks + [self.open.seal()]
+        return self.chunks
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        for chunk in self._all_chunks():
+            yield from chunk
+
+    def scan(self, start: Optional[int] = None, end: Optional[int] = None,
+             sealed_only: bool = False) -> Iterator[Tuple[int, float]]:
+        """Stream points with start <= timestamp < end, skipping chunks outside the range."""
+        for chunk in self._all_chunks(sealed_only):
+            if (start is not None and chunk.max_time < start) or (end is not None and chunk.min_time >= end):
+                continue
+            for timestamp, value in chunk:
+                if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                    yield timestamp, value
+
+    def aggregate(self, start: Optional[int] = None, end: Optional[int] = None,
+                  sealed_only: bool = False) -> Dict[str, float]:
+        """Count, sum, min and max over [start, end), decoding only partially covered chunks."""
+        count, total = 0, 0.0
+        minimum, maximum = float("inf"), float("-inf")
+        for chunk in self._all_chunks(sealed_only):
+            if (start is not None and chunk.max_time < start) or (end is not None and chunk.min_time >= end):
+                continue
+            if (start is None or chunk.min_time >= start) and (end is None or chunk.max_time < end):
+                count += chunk.count
+                total += chunk.total
+                minimum = min(minimum, chunk.minimum)
+                maximum = max(maximum, chunk.maximum)
+                continue
+            for timestamp, value in chunk:
+                if (start is None or timestamp >= start) and (end is None or timestamp < end):
+                    count += 1
+                    total += value
+                    minimum = min(minimum, value)
+                    maximum = max(maximum, value)
+        if not count:
+            return {"count": 0, "sum": 0.0, "min": 0.0, "max": 0.0, "mean": 0.0}
+        return {"count": count, "sum": total, "min": minimum, "max": maximum, "mean": total / count}
+
+    def nbytes(self) -> int:
+        return sum(chunk.nbytes() for chunk in self.chunks) + (self.open.nbytes() if self.open else 0)
+
+
+class CompressedHistory:
+    """Compressed reading history, one series per (device_id, reading_type)."""
+
+    def __init__(self, chunk_size: int = 1024, resolution: timedelta = timedelta(seconds=1)):
+        self.chunk_size = chunk_size
+        self.tick = resolution // timedelta(microseconds=1)
+        if self.tick < 1:
+            raise ValueError("resolution must be at least one microsecond")
+        self.series: Dict[Tuple[str, str], CompressedSeries] = {}
+
+    def __len__(self) -> int:
+        return sum(len(series) for series in self.series.values())
+
+    def _ticks(self, timestamp: Optional[datetime]) -> Optional[int]:
+        return to_micros(timestamp) // self.tick if timestamp is not None else None
+
+    def append(self, reading: EnergyReading) -> bool:
+        """Add a reading; True if this sealed a chunk of its (device_id, reading_type) series."""
+        key = (reading.device_id, reading.reading_type)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = CompressedSeries(self.chunk_size)
+        return series.append(to_micros(reading.timestamp) // self.tick, reading.consumption)
+
+    def _matching(self, device_id: Optional[str], reading_type: Optional[str]):
+        for key, series in self.series.items():
+            if (device_id is None or key[0] == device_id) and (reading_type is None or key[1] == reading_type):
+                yield key, series
+
+    def readings(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                 device_id: Optional[str] = None, reading_type: Optional[str] = None,
+                 sealed_only: bool = False) -> Iterator[EnergyReading]:
+        """Stream decoded readings in [start, end), series by series."""
+        low, high = self._ticks(start), self._ticks(end)
+        for (device, kind), series in self._matching(device_id, reading_type):
+            for timestamp, value in series.scan(low, high, sealed_only):
+                yield EnergyReading(from_micros(timestamp * self.tick), value, device, kind)
+
+    def device_totals(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      sealed_only: bool = False) -> Dict[str, float]:
+        """Consumption per device over [start, end), from chunk summaries where possible."""
+        low, high = self._ticks(start), self._ticks(end)
+        totals: Dict[str, float] = {}
+        for (device, _), series in self.series.items():
+            result = series.aggregate(low, high, sealed_only)
+            if result["count"]:
+                totals[device] = totals.get(device, 0.0) + result["sum"]
+        return totals
+
+    def aggregate(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  device_id: Optional[str] = None, reading_type: Optional[str] = None) -> Dict[str, float]:
+        """Count, sum, min, max and mean consumption over [start, end)."""
+        low, high = self._ticks(start), self._ticks(end)
+        count, total = 0, 0.0
+        minimum, maximum = float("inf"), float("-inf")
+        for _, series in self._matching(device_id, reading_type):
+            result = series.aggregate(low, high)
+            if result["count"]:
+                count += result["count"]
+                total += result["sum"]
+                minimum = min(minimum, result["min"])
+                maximum = max(maximum, result["max"])
+        if not count:
+            return {"count": 0, "sum": 0.0, "min": 0.0, "max": 0.0, "mean": 0.0}
+        return {"count": count, "sum": total, "min": minimum, "max": maximum, "mean": total / count}
+
+    def nbytes(self) -> int:
+        """Encoded size of every chunk, as written by dump()."""
+        return sum(series.nbytes() for series in self.series.values())
+
+    def dump(self, stream: BinaryIO) -> None:
+        """Write every series (sealing open chunks) to a binary stream."""
+        stream.write(MAGIC + struct.pack("<HIQ", VERSION, len(self.series), self.tick))
+        for (device_id, reading_type), series in self.series.items():
+            series.seal()
+            for text in (device_id, reading_type):
+                encoded = text.encode("utf-8")
+                stream.write(struct.pack("<H", len(encoded)) + encoded)
+            stream.write(struct.pack("<I", len(series.chunks)))
+            for chunk in series.chunks:
+                stream.write(CHUNK_HEADER.pack(chunk.count, chunk.min_time, chunk.max_time, chunk.first_time,
+                                               chunk.first_bits, chunk.total, chunk.minimum, chunk.maximum,
+                                               len(chunk.payload)))
+                stream.write(chunk.payload)
+
+    @classmethod
+    def load(cls, stream: BinaryIO, chunk_size: int = 1024) -> 'CompressedHistory':
+        if stream.read(4) != MAGIC:
+            raise ValueError("Not a compressed reading history")
+        version, series_count = struct.unpack("<HI", stream.read(6))
+        if version == 1:
+            tick = 1
+        elif version == VERSION:
+            (tick,) = struct.unpack("<Q", stream.read(8))
+        else:
+            raise ValueError(f"Unsupported compressed history version {version}")
+        history = cls(chunk_size, timedelta(microseconds=tick))
+        for _ in range(series_count):
+            key = []
+            for _ in range(2):
+                (length,) = struct.unpack("<H", stream.read(2))
+                key.append(stream.read(length).decode("utf-8"))
+            series = history.series[tuple(key)] = CompressedSeries(chunk_size)
+            (chunk_count,) = struct.unpack("<I", stream.read(4))
+            for _ in range(chunk_count):
+                fields = CHUNK_HEADER.unpack(stream.read(CHUNK_HEADER.size))
+                series.chunks.append(Chunk(*fields[:-1], stream.read(fields[-1])))
+        return history
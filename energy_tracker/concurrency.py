@@ -0,0 +1,274 @@
+"""Locks and consistent snapshots for EnergyTrackingSystem(thread_safe=True).
+
+Ingest threads hold the shared side of a reader-writer lock on the zone tree,
+update their zone under that zone's own lock and the shared structures
+(history, recent window, optional indexes) under one short lock. With a
+reorder buffer, a push and the ingest of the readings it releases happen under
+one release lock, so history stays in timestamp order. Adding a zone takes the
+exclusive side.
+
+Queries read a ``SystemSnapshot`` instead of the live structures. Zone reading
+lists are append-only, so a snapshot only records each zone's list, length
+and total. It holds the shared side of the zone tree lock and every zone's own
+lock while it copies them, so it is one consistent cut across all zones, and
+ingest waits only for that O(zones) copy rather than for in-flight readings
+to drain. Long scans then run on the snapshot without holding any lock.
+Query results computed from a snapshot are cached only if no reading was
+ingested in the meantime.
+
+Run ``python -m energy_tracker.concurrency`` for a stress check that ingests
+from several threads while others query and drain tasks, then verifies no
+update was lost. Zone updates are made to yield mid read-modify-write, so the
+same check run without the locks fails.
+"""
+
+import sys
+import threading
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .tracking import EnergyReading, reading_sort_key
+
+
+class ReadWriteLock:
+    """Many readers or one writer; waiting writers block new readers."""
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.readers = 0
+        self.writer = False
+        self.waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self.condition:
+            while self.writer or self.waiting_writers:
+                self.condition.wait()
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self.condition:
+            self.waiting_writers += 1
+            while self.writer or self.readers:
+                self.condition.wait()
+            self.waiting_writers -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+class ZoneLocks:
+    def __init__(self):
+        self.locks: Dict[str, threading.Lock] = {}
+
+    def get(self, zone_name: str) -> threading.Lock:
+        lock = self.locks.get(zone_name)
+        if lock is None:
+            # setdefault is atomic, so racing threads end up sharing one lock
+            lock = self.locks.setdefault(zone_name, threading.Lock())
+        return lock
+
+
+# (parent name, child names, the zone's reading list, readings visible, total consumption)
+ZoneState = Tuple[Optional[str], Tuple[str, ...], List[EnergyReading], int, float]
+
+
+class SystemSnapshot:
+    """Read-only view of every zone as of one epoch."""
+
+    def __init__(self, epoch: int, root: str, zones: Dict[str, ZoneState]):
+        self.epoch = epoch
+        self.root = root
+        self.zones = zones
+
+    def zone_readings(self, zone_name: str) -> List[EnergyReading]:
+        _, _, readings, count, _ = self.zones[zone_name]
+        return readings[:count]
+
+    def readings(self) -> Iterator[EnergyReading]:
+        for _, _, readings, count, _ in self.zones.values():
+            yield from readings[:count]
+
+    def reading_count(self) -> int:
+        return sum(state[3] for state in self.zones.values())
+
+    def get_zone_total(self, zone_name: str, include_children: bool = True) -> Optional[float]:
+        if zone_name not in self.zones:
+            return None
+        if not include_children:
+            return self.zones[zone_name][4]
+        total, stack = 0.0, [zone_name]
+        while stack:
+            _, children, _, _, zone_total = self.zones[stack.pop()]
+            total += zone_total
+            stack.extend(children)
+        return total
+
+    def get_readings_between(self, start: datetime, end: datetime) -> List[EnergyReading]:
+        """Readings with start <= timestamp < end, by timestamp then device id."""
+        selected = [reading for reading in self.readings() if start <= reading.timestamp < end]
+        selected.sort(key=reading_sort_key)
+        return selected
+
+    def get_top_devices(self, n: int = 10, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        totals: Dict[str, float] = {}
+        for reading in self.readings():
+            if (start is None or reading.timestamp >= start) and (end is None or reading.timestamp < end):
+                totals[reading.device_id] = totals.get(reading.device_id, 0.0) + reading.consumption
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def take_snapshot(system, epoch: int) -> SystemSnapshot:
+    """Capture the zone tree; the caller holds at least the shared side of the zone tree lock."""
+    node_map = system.hierarchy.node_map
+    with ExitStack() as held:
+        if system.zone_locks is not None:
+            # Ingest holds at most one zone lock at a time and snapshots take them in
+            # node_map order, so holding all of them cannot deadlock
+            for name in node_map:
+                held.enter_context(system.zone_locks.get(name))
+        zones = {name: (node.parent_id, tuple(child.name for child in node.children), node.readings,
+                        len(node.readings), node.total_consumption)
+                 for name, node in node_map.items()}
+    return SystemSnapshot(epoch, system.hierarchy.root.name, zones)
+
+
+def _contended(node) -> None:
+    """Make a zone's running-total update yield the GIL between its read and its write.
+
+    CPython rarely switches threads inside ``total += value``, so without this a
+    missing lock almost never loses an update and the check would prove nothing.
+    """
+    import time
+
+    def add_reading(reading: EnergyReading, queue_task: bool = True) -> None:
+        node.readings.append(reading)
+        total = node.total_consumption
+        time.sleep(0)  # let another ingest thread run mid read-modify-write
+        node.total_consumption = total + reading.consumption
+        if queue_task:
+            node.processing_queue.enqueue_task(reading, "consumption_analysis", node.name)
+
+    node.add_reading = add_reading
+
+
+def stress_check(threads: int = 4, readings_per_thread: int = 2_000, zones: int = 8,
+                 readers: int = 2, thread_safe: bool = True) -> Dict[str, float]:
+    """Ingest from several threads into shared zones while others query and drain tasks.
+
+    Every zone update is forced to yield mid read-modify-write, so with
+    thread_safe=False the check fails. Raises AssertionError if any update was
+    lost, a snapshot was inconsistent or a task was processed other than once.
+    """
+    import time
+    from datetime import timedelta
+    from .handlers import TaskHandlerRegistry
+    from .tracking import EnergyTrackingSystem
+
+    processed: List[int] = []
+    handlers = TaskHandlerRegistry()
+    handlers.register("system_analysis", lambda tasks: processed.extend(id(task.reading) for task in tasks))
+    system = EnergyTrackingSystem(thread_safe=thread_safe, handlers=handlers, dispatch_batch_size=64)
+    zone_names = [f"Zone {i}" for i in range(zones)]
+    for i, zone_name in enumerate(zone_names):
+        system.add_zone(zone_name, "Building" if i < 2 else zone_names[i % 2])
+        _contended(system.hierarchy.node_map[zone_name])
+    start_time = datetime(2024, 1, 1)
+    expected: Dict[str, float] = {zone_name: 0.0 for zone_name in zone_names}
+    expected_lock = threading.Lock()
+    done = threading.Event()
+    errors: List[str] = []
+    snapshots = [0]
+
+    def ingest(worker: int) -> None:
+        local = {zone_name: 0.0 for zone_name in zone_names}
+        for i in range(readings_per_thread):
+            zone_name = zone_names[(i + worker) % zones]
+            consumption = 0.25 * (1 + (i % 4))  # exact in binary, so sums don't drift
+            reading = EnergyReading(start_time + timedelta(seconds=i), consumption, f"meter-{worker}", "peak")
+            if not system.add_reading(reading, zone_name):
+                errors.append(f"reading rejected in {zone_name}")
+            local[zone_name] += consumption
+        with expected_lock:
+            for zone_name, total in local.items():
+                expected[zone_name] += total
+
+    def query() -> None:
+        previous = -1
+        while not done.is_set():
+            snapshot = system.snapshot()
+            count = snapshot.reading_count()
+            if count < previous:
+                errors.append("snapshot went backwards")
+            previous = count
+            for zone_name in zone_names:
+                listed = sum(reading.consumption for reading in snapshot.zone_readings(zone_name))
+                if listed != snapshot.get_zone_total(zone_name, include_children=False):
+                    errors.append(f"inconsistent snapshot of {zone_name}")
+            snapshot.get_top_devices(3)
+            snapshots[0] += 1
+
+    def drain() -> None:
+        while not done.is_set():
+            system.process_all_pending()
+
+    workers = [threading.Thread(target=ingest, args=(i,)) for i in range(threads)]
+    background = [threading.Thread(target=query) for _ in range(readers)] + [threading.Thread(target=drain)]
+    # Each forced switch otherwise waits out the default 5ms switch interval
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        started = time.perf_counter()
+        for thread in background + workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in background:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    system.process_all_pending()
+
+    assert not errors, errors[:5]
+    total = threads * readings_per_thread
+    assert system.history.size == total, (system.history.size, total)
+    for zone_name in zone_names:
+        actual = system.get_zone_total(zone_name, include_children=False)
+        assert actual == expected[zone_name], (zone_name, actual, expected[zone_name])
+    assert len(processed) == len(set(processed)) == total, (len(processed), len(set(processed)), total)
+    return {"readings": total, "seconds": elapsed, "readings_per_second": total / elapsed,
+            "snapshots": snapshots[0]}
+
+
+def main():
+    # Example usage and testing
+    result = stress_check()
+    print(f"Ingested {result['readings']} readings from 4 threads in {result['seconds']:.2f}s "
+          f"({result['readings_per_second']:.0f}/s) while taking {result['snapshots']} snapshots")
+    print("No lost updates; every snapshot was consistent; every task processed once")
+    try:
+        stress_check(thread_safe=False)
+    except AssertionError as exc:
+        print(f"Without locks the same check fails as expected: {str(exc)[:100]}")
+    else:
+        print("Without locks the check unexpectedly passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Bounded-memory suppression of duplicate (device_id, timestamp) readings.
+
+The remembered ``window`` of reading time is split into ``generations``
+buckets, each with its own Bloom filter sized for ``bucket_capacity`` keys at
+the configured false-positive rate; when a newer bucket opens the oldest is
+dropped, so memory stays constant however long the stream runs. In front of the filters sits an
+exact LRU set of the most recently seen keys. While a reading is newer than
+anything evicted from that set, the exact set alone decides, so recent
+duplicates are detected with no false positives. Older readings fall back to
+the Bloom filter of their bucket. Readings older than the window, or too far
+ahead of the newest bucket to trust, are only checked against the exact set
+and never move the window.
+
+Keys are hashed with Python's ``hash()``, so filters are only meaningful
+within one process and are not persisted.
+"""
+
+import math
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Optional
+
+from .tracking import EnergyReading
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class BloomFilter:
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.size = max(64, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: Hashable):
+        # Double hashing: derive every probe from the two halves of one 64-bit hash
+        value = hash(key) & 0xFFFFFFFFFFFFFFFF
+        first, step = value & 0xFFFFFFFF, (value >> 32) | 1
+        size = self.size
+        return [(first + i * step) % size for i in range(self.hashes)]
+
+    def add(self, key: Hashable) -> None:
+        bits = self.bits
+        for position in self._positions(key):
+            bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: Hashable) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+
+class DuplicateFilter:
+    def __init__(self, window: timedelta = timedelta(days=1), generations: int = 24,
+                 bucket_capacity: int = 100_000, false_positive_rate: float = 0.001,
+                 exact_capacity: int = 50_000, max_ahead: Optional[int] = None):
+        if not 0 < false_positive_rate < 1:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        self.bucket_seconds = window.total_seconds() / generations
+        self.generations = generations
+        self.bucket_capacity = bucket_capacity
+        self.false_positive_rate = false_positive_rate
+        self.exact_capacity = exact_capacity
+        # Buckets further than this past the newest one never open a filter, so one
+        # bad future timestamp cannot expire every filter
+        self.max_ahead = generations if max_ahead is None else max_ahead
+        self.filters: Dict[int, BloomFilter] = {}
+        self.newest_bucket: Optional[int] = None
+        self.exact: "OrderedDict[Hashable, datetime]" = OrderedDict()
+        self.exact_horizon: Optional[datetime] = None  # newest timestamp evicted from the exact set
+        self.duplicates = 0
+        self.too_old = 0
+        self.too_new = 0
+        self._last_timestamp: Optional[datetime] = None
+        self._last_bucket = 0
+
+    def _bucket(self, timestamp: datetime) -> int:
+        # Meters report on the same ticks, so consecutive readings usually share a timestamp
+        if timestamp == self._last_timestamp:
+            return self._last_bucket
+        self._last_timestamp = timestamp
+        seconds = (timestamp.replace(tzinfo=None) - EPOCH).total_seconds()
+        self._last_bucket = bucket = int(seconds // self.bucket_seconds)
+        return bucket
+
+    def check_and_add(self, reading: EnergyReading) -> bool:
+        """Return True if the reading was seen before, otherwise remember it."""
+        key = (reading.device_id, reading.timestamp)
+        if key in self.exact:
+            self.exact.move_to_end(key)
+            self.duplicates += 1
+            return True
+
+        bucket = self._bucket(reading.timestamp)
+        if self.newest_bucket is not None and bucket <= self.newest_bucket - self.generations:
+            # Older than anything the filters remember: only the exact set can catch retries
+            self.too_old += 1
+            self._remember(key, reading.timestamp)
+            return False
+        if self.newest_bucket is not None and bucket > self.newest_bucket + self.max_ahead:
+            self.too_new += 1
+            self._remember(key, reading.timestamp)
+            return False
+        bloom = self.filters.get(bucket)
+        if (bloom is not None and (self.exact_horizon is None or reading.timestamp <= self.exact_horizon)
+                and key in bloom):
+            self.duplicates += 1
+            return True
+
+        if bloom is None:
+            bloom = self.filters[bucket] = BloomFilter(self.bucket_capacity, self.false_positive_rate)
+            if self.newest_bucket is None or bucket > self.newest_bucket:
+                self.newest_bucket = bucket
+                for expired in [w for w in self.filters if w <= bucket - self.generations]:
+                    del self.filters[expired]
+        bloom.add(key)
+        self._remember(key, reading.timestamp)
+        return False
+
+    def _remember(self, key: Hashable, timestamp: datetime) -> None:
+        self.exact[key] = timestamp
+        if len(self.exact) > self.exact_capacity:
+            _, evicted = self.exact.popitem(last=False)
+            if self.exact_horizon is None or evicted > self.exact_horizon:
+                self.exact_horizon = evicted
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the Bloom filters (the exact set is bounded by exact_capacity)."""
+        return sum(bloom.memory_bytes() for bloom in self.filters.values())
@@ -0,0 +1,172 @@
+"""Online Holt-Winters forecasts for every device and zone.
+
+Readings are summed into hourly buckets per series. When a reading lands in a
+later hour, the finished bucket (and any empty hours in between) updates an
+additive Holt-Winters model with a 24-hour season. Each series keeps a fixed
+amount of state and each update costs O(1), so forecasts can be read at any
+time without refitting over history. Whole days of empty hours are skipped in
+O(log days) with precomputed powers of the linear map one empty day applies.
+"""
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .tracking import EnergyReading
+
+EPOCH = datetime(1970, 1, 1)
+SEASON_LENGTH = 24
+SeriesKey = Tuple[str, str]  # ("device", device_id) or ("zone", zone_name)
+
+
+def hour_index(timestamp: datetime) -> int:
+    """Hours since 1970-01-01 in the reading's own wall-clock time."""
+    return int((timestamp.replace(tzinfo=None) - EPOCH).total_seconds() // 3600)
+
+
+class HoltWinters:
+    """Additive Holt-Winters over hourly totals with daily seasonality."""
+
+    __slots__ = ("alpha", "beta", "gamma", "level", "trend", "season", "observed",
+                 "hour", "bucket")
+
+    def __init__(self, alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.2):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.level = 0.0
+        self.trend = 0.0
+        self.season = [0.0] * SEASON_LENGTH
+        self.observed = 0  # completed hourly buckets
+        self.hour: Optional[int] = None  # hour index of the open bucket
+        self.bucket = 0.0
+
+    def add(self, hour: int, consumption: float) -> None:
+        """Add a reading's consumption to its hour, closing any finished hours first."""
+        if self.hour is None:
+            self.hour = hour
+        # Late readings for an already closed hour count toward the open one
+        if hour > self.hour:
+            self._close_bucket()
+            while hour > self.hour and self.observed < SEASON_LENGTH:
+                self._close_bucket()
+            days = (hour - self.hour) // SEASON_LENGTH
+            if days:
+                self._skip_empty_days(days)
+            while hour > self.hour:
+                self._close_bucket()
+        self.bucket += consumption
+
+    def _skip_empty_days(self, days: int) -> None:
+        """Close days * SEASON_LENGTH empty hours after warm-up, in O(log days)."""
+        state = [self.level, self.trend] + self.season
+        phase = self.hour % SEASON_LENGTH
+        remaining, power = days, 0
+        while remaining:
+            if remaining & 1:
+                matrix = _empty_days_map(self.alpha, self.beta, self.gamma, phase, power)
+                state = [sum(weight * value for weight, value in zip(row, state)) for row in matrix]
+            remaining >>= 1
+            power += 1
+        self.level, self.trend, self.season = state[0], state[1], state[2:]
+        self.observed += days * SEASON_LENGTH
+        self.hour += days * SEASON_LENGTH
+
+    def _close_bucket(self) -> None:
+        value = self.bucket
+        slot = self.hour % SEASON_LENGTH
+        if self.observed < SEASON_LENGTH:
+            # Warm-up: collect one full day, then derive level and seasonal offsets
+            self.season[slot] = value
+            self.observed += 1
+            if self.observed == SEASON_LENGTH:
+                self.level = sum(self.season) / SEASON_LENGTH
+                self.season = [offset - self.level for offset in self.season]
+            else:
+                self.level += (value - self.level) / self.observed
+        else:
+            previous_level = self.level
+            self.level = self.alpha * (value - self.season[slot]) + (1 - self.alpha) * (self.level + self.trend)
+            self.trend = self.beta * (self.level - previous_level) + (1 - self.beta) * self.trend
+            self.season[slot] = self.gamma * (value - self.level) + (1 - self.gamma) * self.season[slot]
+            self.observed += 1
+        self.hour += 1
+        self.bucket = 0.0
+
+    def forecast(self, steps: int = 1) -> List[float]:
+        """Expected consumption for the open hour and the steps - 1 hours after it."""
+        if self.hour is None:
+            return [0.0] * steps
+        if self.observed < SEASON_LENGTH:
+            return [max(self.level, 0.0)] * steps
+        return [
+            max(self.level + step * self.trend + self.season[(self.hour + step - 1) % SEASON_LENGTH], 0.0)
+            for step in range(1, steps + 1)
+        ]
+
+
+@lru_cache(maxsize=1024)
+def _empty_days_map(alpha: float, beta: float, gamma: float, phase: int, power: int) -> Tuple[Tuple[float, ...], ...]:
+    """Rows of the matrix taking (level, trend, *season) across 2 ** power empty days.
+
+    Empty hours update the model linearly, so one day starting at hour slot
+    ``phase`` is found by closing 24 zero buckets from each unit state, and
+    longer spans by squaring. Shared by every series with the same smoothing.
+    """
+    if power:
+        half = _empty_days_map(alpha, beta, gamma, phase, power - 1)
+        columns = list(zip(*half))
+        return tuple(tuple(sum(a * b for a, b in zip(row, column)) for column in columns) for row in half)
+    size = 2 + SEASON_LENGTH
+    probe = HoltWinters(alpha, beta, gamma)
+    images = []
+    for unit in range(size):
+        state = [0.0] * size
+        state[unit] = 1.0
+        probe.level, probe.trend, probe.season = state[0], state[1], state[2:]
+        probe.observed, probe.hour = SEASON_LENGTH, phase
+        for _ in range(SEASON_LENGTH):
+            probe._close_bucket()
+        images.append([probe.level, probe.trend] + probe.season)
+    return tuple(zip(*images))
+
+
+class ForecastEngine:
+    def __init__(self, alpha: float = 0.3, beta: float = 0.05, gamma: float = 0.2):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.series: Dict[SeriesKey, HoltWinters] = {}
+
+    def _series(self, key: SeriesKey) -> HoltWinters:
+        model = self.series.get(key)
+        if model is None:
+            model = self.series[key] = HoltWinters(self.alpha, self.beta, self.gamma)
+        return model
+
+    def observe(self, reading: EnergyReading, zone_path: Iterable[str]) -> None:
+        """Update the reading's device and its zone plus every ancestor zone."""
+        hour = hour_index(reading.timestamp)
+        self._series(("device", reading.device_id)).add(hour, reading.consumption)
+        for zone_name in zone_path:
+            self._series(("zone", zone_name)).add(hour, reading.consumption)
+
+    def forecast(self, kind: str, name: str, hours: int = 1) -> Optional[List[float]]:
+        """Hourly forecasts for a device or zone, or None if it has no readings yet."""
+        model = self.series.get((kind, name))
+        return model.forecast(hours) if model is not None else None
+
+    def next_hour(self, kind: str, name: str) -> Optional[float]:
+        forecast = self.forecast(kind, name, 1)
+        return forecast[0] if forecast is not None else None
+
+    def next_day(self, kind: str, name: str) -> Optional[float]:
+        forecast = self.forecast(kind, name, SEASON_LENGTH)
+        return sum(forecast) if forecast is not None else None
+
+    def forecast_start(self, kind: str, name: str) -> Optional[datetime]:
+        """Start of the first hour covered by forecast()."""
+        model = self.series.get((kind, name))
+        if model is None or model.hour is None:
+            return None
+        return EPOCH + timedelta(hours=model.hour)
@@ -0,0 +1,54 @@
+"""Registry of batch handlers keyed by processing task type.
+
+Handlers receive a list of ``ProcessingTask`` objects of one task type so they
+can work on the whole batch at once::
+
+    from energy_tracker.handlers import task_handlers
+
+    @task_handlers.handler("consumption_analysis", batch_size=512, max_latency=0.1)
+    def analyse(tasks):
+        total = sum(task.reading.consumption for task in tasks)
+
+Task types without a handler are simply marked processed, as before.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+BatchHandler = Callable[[List[Any]], Any]
+
+
+@dataclass
+class TaskHandler:
+    handler: BatchHandler
+    batch_size: int = 256
+    max_latency: float = 0.05  # seconds a partial batch may wait for more tasks
+
+
+class TaskHandlerRegistry:
+    def __init__(self):
+        self.handlers: Dict[str, TaskHandler] = {}
+
+    def register(self, task_type: str, handler: BatchHandler,
+                 batch_size: int = 256, max_latency: float = 0.05) -> TaskHandler:
+        """Register the batch handler for a task type, replacing any previous one."""
+        entry = TaskHandler(handler, max(1, batch_size), max_latency)
+        self.handlers[task_type] = entry
+        return entry
+
+    def handler(self, task_type: str, batch_size: int = 256,
+                max_latency: float = 0.05) -> Callable[[BatchHandler], BatchHandler]:
+        """Decorator form of register()."""
+        def decorator(function: BatchHandler) -> BatchHandler:
+            self.register(task_type, function, batch_size, max_latency)
+            return function
+        return decorator
+
+    def unregister(self, task_type: str) -> bool:
+        return self.handlers.pop(task_type, None) is not None
+
+    def get(self, task_type: str) -> Optional[TaskHandler]:
+        return self.handlers.get(task_type)
+
+
+task_handlers = TaskHandlerRegistry()
@@ -0,0 +1,24 @@
+"""General tree for the residential consumption hierarchy."""
+
+class TreeNode:
+    def __init__(self, data):
+        self.data = data
+        self.children = []
+
+    def add_child(self, child_node):
+        self.children.append(child_node)
+
+    def display(self, level=0):
+        print("  " * level + str(self.data))
+        for child in self.children:
+            child.display(level + 1)
+
+class HierarchicalTree:
+    def __init__(self, root_data):
+        self.root = TreeNode(root_data)
+
+    def memory_report(self, sample=64):
+        """Node count and estimated deep size in bytes, measuring about sample nodes."""
+        from .memory import deep_sizeof, tree_sizeof
+        nodes, size = tree_sizeof(self.root, lambda node: node.children, sample=sample)
+        return {"nodes": nodes, "bytes": deep_sizeof(self, sample, stop=(TreeNode,)) + size}
@@ -0,0 +1,80 @@
+"""Doubly linked list used for daily consumption logs."""
+
+class Node:
+    def __init__(self, data):
+        self.data = data
+        self.prev = None
+        self.next = None
+
+class DoublyLinkedList:
+    def __init__(self):
+        self.head = None
+        self.tail = None
+
+    def append(self, data):
+        new_node = Node(data)
+        if not self.head:
+            self.head = self.tail = new_node
+        else:
+            self.tail.next = new_node
+            new_node.prev = self.tail
+            self.tail = new_node
+
+    def remove(self, data):
+        current = self.head
+        while current:
+            if current.data == data:
+                if current.prev:
+                    current.prev.next = current.next
+                else:
+                    self.head = current.next
+
+                if current.next:
+                    current.next.prev = current.prev
+                else:
+                    self.tail = current.prev
+                return True
+            current = current.next
+        return False
+
+    def display(self):
+        current = self.head
+        while current:
+            print(current.data, end=' <-> ' if current.next else '\n')
+            current = current.next
+
+    def to_list(self):
+        result = []
+        current = self.head
+        while current:
+            result.append(current.data)
+            current = current.next
+        return result
+
+    def from_list(self, data_list):
+        self.head = self.tail = None
+        for data in data_list:
+            self.append(data)
+
+    def memory_report(self, sample=64):
+        """Node count and estimated deep size in bytes, measuring about sample nodes."""
+        from .memory import chain_sizeof, deep_sizeof
+        nodes, size = chain_sizeof(self.head, sample=sample)
+        return {"nodes": nodes, "bytes": deep_sizeof(self, sample, stop=(Node,)) + size}
+
+    def selection_sort(self, key=None):
+        current = self.head
+        while current:
+            smallest = current
+            check = current.next
+            while check:
+                if key:
+                    if key(check.data) < key(smallest.data):
+                        smallest = check
+                else:
+                    if check.data < smallest.data:
+                        smallest = check
+                check = check.next
+            if smallest != current:
+                current.data, smallest.data = smallest.data, current.data
+            current = current.next
@@ -0,0 +1,238 @@
+"""Seeded synthetic meter fleet and a replay load driver.
+
+``MeterFleet`` lays out buildings, floors and rooms, gives every room a mix of
+appliances and generates their readings offline. Each appliance follows a
+daily curve (sums of hourly bumps such as a morning and an evening peak)
+scaled by a seasonal factor: heating peaks in January, cooling in July. Each
+household gets its own scale and each reading multiplicative noise. Readings
+between 07:00 and 23:00 are "peak", the rest "off-peak". The same seed
+always produces the same fleet and readings.
+
+``replay`` pushes a reading stream into an EnergyTrackingSystem as fast as
+possible or at a fixed rate. It reports sustained throughput and latency
+percentiles. With a fixed rate, latency is also measured from each reading's
+scheduled send time, so a stalled system shows up as queueing delay instead
+of being hidden by the driver slowing down.
+
+Run e.g. ``python -m energy_tracker.loadgen --days 2 --rate 20000``.
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .tracking import EnergyReading, EnergyTrackingSystem, Priority
+
+START = datetime(2025, 1, 1)
+
+
+class Appliance(NamedTuple):
+    kind: str
+    base_kwh: float  # average consumption per hour at a daily-curve value of 1
+    # (hour, height, width in hours) bumps added to a flat floor of 1
+    bumps: Tuple[Tuple[float, float, float], ...]
+    heating: float = 0.0  # extra share of load at the coldest point of the year
+    cooling: float = 0.0  # extra share of load at the hottest point of the year
+    noise: float = 0.15
+
+
+APPLIANCES = {
+    "fridge": Appliance("fridge", 0.06, ((15.0, 0.3, 4.0),), cooling=0.3, noise=0.25),
+    "lighting": Appliance("lighting", 0.02, ((7.0, 2.0, 1.5), (20.0, 6.0, 2.5)), heating=0.4),
+    "heater": Appliance("heater", 0.3, ((7.0, 3.0, 2.0), (19.0, 4.0, 3.0)), heating=3.0),
+    "air_conditioner": Appliance("air_conditioner", 0.2, ((15.0, 5.0, 3.0),), cooling=4.0),
+    "water_heater": Appliance("water_heater", 0.15, ((7.0, 5.0, 1.0), (21.0, 3.0, 1.5)), heating=0.5),
+    "television": Appliance("television", 0.03, ((20.5, 6.0, 2.0),)),
+    "washer": Appliance("washer", 0.05, ((10.0, 8.0, 1.0), (18.0, 5.0, 1.0)), noise=0.6),
+    "ev_charger": Appliance("ev_charger", 0.1, ((1.0, 20.0, 2.0),), heating=0.2, noise=0.4),
+}
+# Relative frequency of each appliance in a room's mix
+APPLIANCE_WEIGHTS = {"fridge": 3, "lighting": 6, "heater": 3, "air_conditioner": 2, "water_heater": 2,
+                     "television": 3, "washer": 1, "ev_charger": 1}
+
+
+def _daily_curve(appliance: Appliance) -> List[float]:
+    """Relative load for each hour of the day, averaging 1."""
+    curve = []
+    for hour in range(24):
+        value = 1.0
+        for peak, height, width in appliance.bumps:
+            distance = min(abs(hour - peak), 24 - abs(hour - peak))  # wraps around midnight
+            value += height * math.exp(-0.5 * (distance / width) ** 2)
+        curve.append(value)
+    mean = sum(curve) / 24
+    return [value / mean for value in curve]
+
+
+def _seasonal_factor(appliance: Appliance, timestamp: datetime) -> float:
+    # +1 in mid-January, -1 in mid-July
+    winter = math.cos(2 * math.pi * (timestamp.timetuple().tm_yday - 15) / 365.25)
+    return 1.0 + appliance.heating * max(winter, 0.0) + appliance.cooling * max(-winter, 0.0)
+
+
+class Meter(NamedTuple):
+    device_id: str
+    zone_name: str
+    appliance: Appliance
+    scale: float
+
+
+class MeterFleet:
+    def __init__(self, buildings: int = 2, floors: int = 3, rooms: int = 4,
+                 devices_per_room: Tuple[int, int] = (2, 6), interval: timedelta = timedelta(minutes=15),
+                 start: datetime = START, seed: int = 2025):
+        self.interval = interval
+        self.start = start
+        self.seed = seed
+        rng = random.Random(seed)
+        self.zones: List[Tuple[str, str]] = []  # (zone, parent) in creation order
+        self.meters: List[Meter] = []
+        kinds = list(APPLIANCE_WEIGHTS)
+        weights = [APPLIANCE_WEIGHTS[kind] for kind in kinds]
+        for building in range(buildings):
+            building_zone = f"Building {building + 1}"
+            self.zones.append((building_zone, "Building"))
+            for floor in range(floors):
+                floor_zone = f"{building_zone} Floor {floor + 1}"
+                self.zones.append((floor_zone, building_zone))
+                for room in range(rooms):
+                    room_zone = f"{floor_zone} Room {room + 1}"
+                    self.zones.append((room_zone, floor_zone))
+                    # One household scale per room, so rooms differ but their appliances agree
+                    household = rng.lognormvariate(0.0, 0.35)
+                    for device in range(rng.randint(*devices_per_room)):
+                        kind = rng.choices(kinds, weights)[0]
+                        device_id = f"b{building + 1}f{floor + 1}r{room + 1}-{kind}-{device + 1}"
+                        self.meters.append(Meter(device_id, room_zone, APPLIANCES[kind], household))
+        self.curves: Dict[str, List[float]] = {kind: _daily_curve(appliance) for kind, appliance in APPLIANCES.items()}
+
+    def __len__(self) -> int:
+        return len(self.meters)
+
+    def install(self, system: EnergyTrackingSystem) -> None:
+        """Create the fleet's zones in a system."""
+        for zone_name, parent_name in self.zones:
+            system.add_zone(zone_name, parent_name)
+
+    def readings(self, duration: timedelta, start: Optional[datetime] = None) -> Iterator[Tuple[EnergyReading, str]]:
+        """Yield (reading, zone) for every meter at every interval, in timestamp order."""
+        rng = random.Random(self.seed + 1)
+        timestamp = start or self.start
+        end = timestamp + duration
+        hours = self.interval.total_seconds() / 3600
+        while timestamp < end:
+            hour = timestamp.hour
+            reading_type = "peak" if 7 <= hour < 23 else "off-peak"
+            seasonal = {kind: _seasonal_factor(appliance, timestamp) for kind, appliance in APPLIANCES.items()}
+            for meter in self.meters:
+                appliance = meter.appliance
+                expected = appliance.base_kwh * hours * meter.scale * self.curves[appliance.kind][hour] \
+                    * seasonal[appliance.kind]
+                consumption = max(expected * rng.gauss(1.0, appliance.noise), 0.0)
+                priority = Priority.HIGH if consumption > 2.5 * expected else Priority.MEDIUM
+                yield EnergyReading(timestamp, round(consumption, 4), meter.device_id, reading_type, priority), \
+                    meter.zone_name
+            timestamp += self.interval
+
+
+class ReplayResult(NamedTuple):
+    readings: int
+    rejected: int
+    seconds: float
+    throughput: float  # readings per second, including periodic processing
+    latency: Dict[str, float]  # add_reading service time percentiles, in seconds
+    response: Optional[Dict[str, float]]  # latency from the scheduled send time (rate-limited runs only)
+    max_lag: float  # furthest behind schedule, in seconds
+
+
+def percentiles(samples: Sequence[float], points: Sequence[float] = (50, 90, 99, 99.9)) -> Dict[str, float]:
+    """Nearest-rank percentiles plus the maximum."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    result = {f"p{point:g}": ordered[min(len(ordered) - 1, math.ceil(point / 100 * len(ordered)) - 1)]
+              for point in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+def replay(system: EnergyTrackingSystem, stream: Iterator[Tuple[EnergyReading, str]], rate: Optional[float] = None,
+           limit: Optional[int] = None, process_every: int = 1000) -> ReplayResult:
+    """Push readings into system, at ``rate`` readings per second or as fast as possible.
+
+    Pending tasks are processed every ``process_every`` readings; that time counts
+    toward throughput but not toward per-reading latency. So does producing the
+    stream, so pass a list rather than a generator to measure the system alone.
+    """
+    service = array("d")
+    response = array("d") if rate else None
+    rejected = sent = 0
+    max_lag = 0.0
+    clock = time.perf_counter
+    started = clock()
+    for reading, zone_name in stream:
+        if limit is not None and sent >= limit:
+            break
+        if rate:
+            scheduled = started + sent / rate
+            now = clock()
+            if now < scheduled:
+                time.sleep(scheduled - now)
+            else:
+                max_lag = max(max_lag, now - scheduled)
+        before = clock()
+        if not system.add_reading(reading, zone_name):
+            rejected += 1
+        after = clock()
+        service.append(after - before)
+        if response is not None:
+            response.append(after - scheduled)
+        sent += 1
+        if process_every and sent % process_every == 0:
+            system.process_all_pending()
+    system.process_all_pending()
+    elapsed = clock() - started
+    return ReplayResult(sent, rejected, elapsed, sent / elapsed if elapsed else 0.0, percentiles(service),
+                        percentiles(response) if response is not None else None, max_lag)
+
+
+def _format_latency(latency: Dict[str, float]) -> str:
+    return ", ".join(f"{name} {value * 1e6:.1f}us" for name, value in latency.items())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a synthetic meter fleet into EnergyTrackingSystem.")
+    parser.add_argument("--buildings", type=int, default=2)
+    parser.add_argument("--floors", type=int, default=3)
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--interval-minutes", type=float, default=15)
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--rate", type=float, help="readings per second (default: as fast as possible)")
+    parser.add_argument("--limit", type=int, help="stop after this many readings")
+    parser.add_argument("--seed", type=int, default=2025)
+    args = parser.parse_args(argv)
+
+    fleet = MeterFleet(args.buildings, args.floors, args.rooms,
+                       interval=timedelta(minutes=args.interval_minutes), seed=args.seed)
+    system = EnergyTrackingSystem()
+    fleet.install(system)
+    print(f"Fleet: {len(fleet.zones)} zones, {len(fleet)} meters, {args.days:g} day(s) "
+          f"at {args.interval_minutes:g}-minute intervals")
+    result = replay(system, fleet.readings(timedelta(days=args.days)), args.rate, args.limit)
+    print(f"Replayed {result.readings} readings ({result.rejected} rejected) in {result.seconds:.2f}s: "
+          f"{result.throughput:.0f} readings/s")
+    print(f"add_reading latency: {_format_latency(result.latency)}")
+    if result.response is not None:
+        print(f"Latency from schedule: {_format_latency(result.response)}; "
+              f"max lag {result.max_lag * 1000:.1f}ms")
+    print(f"Building total: {system.get_zone_total('Building'):.1f} kWh")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
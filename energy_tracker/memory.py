@@ -0,0 +1,141 @@
+"""Sampled deep memory accounting for the tracker's data structures.
+
+``sys.getsizeof`` only counts an object's own header. ``deep_sizeof`` also
+follows everything it references (container items, instance attributes and
+``__slots__``, via ``gc.get_referents``). Each object is counted once. Large containers are not walked in
+full. Only about ``sample`` evenly spaced elements are measured and the
+result is scaled by the container's length, so a report costs roughly the
+same for a thousand readings as for a million. Linked chains and trees are
+sampled the same way by ``chain_sizeof`` and ``tree_sizeof``.
+
+Classes, modules, functions, bound methods and enum members are shared, so
+they are never counted.
+"""
+
+import gc
+import sys
+from enum import Enum
+from itertools import islice
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+SHARED_TYPES = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType, Enum)
+LEAF_TYPES = (str, bytes, bytearray, int, float, complex, bool, memoryview, range)
+INSTANCE_VALUES_HEADER = 16
+SHARED_REFCOUNT = 16
+
+
+def _sampled(items: Iterable, length: int, sample: int) -> Tuple[List[Any], float]:
+    """About sample evenly spaced items and the factor that scales them back up."""
+    if length <= sample:
+        return list(items), 1.0
+    step = length // sample
+    picked = list(items[::step]) if isinstance(items, (list, tuple)) else list(islice(items, 0, None, step))
+    return picked, length / len(picked)
+
+
+def _referents(obj: Any, sample: int) -> Tuple[List[Any], float]:
+    if isinstance(obj, dict):
+        items, scale = _sampled(iter(obj.items()), len(obj), sample)
+        return [part for item in items for part in item], scale
+    if isinstance(obj, (list, tuple)):
+        return _sampled(obj, len(obj), sample)
+    if isinstance(obj, (set, frozenset)) or hasattr(obj, "maxlen"):  # sets and deques
+        return _sampled(iter(obj), len(obj), sample)
+    # Unlike reading __dict__, this does not materialise an instance dict that
+    # newer Pythons keep as an inline array of values.
+    return gc.get_referents(obj), 1.0
+
+
+def _instance_overhead(obj: Any, referents: List[Any]) -> int:
+    if type(obj).__dictoffset__ and not isinstance(obj, (dict, list, tuple, set, frozenset)):
+        # Attribute storage: one pointer per value plus a small header
+        return INSTANCE_VALUES_HEADER + 8 * len(referents)
+    return 0
+
+
+def _walk(roots: List[Tuple[Any, float, bool]], sample: int, stop: Tuple[type, ...]) -> int:
+    """Sum the weighted sizes reachable from (object, weight, is_root) entries."""
+    seen = set()
+    total = 0.0
+    stack = list(roots)
+    while stack:
+        current, weight, is_root = stack.pop()
+        if id(current) in seen or isinstance(current, SHARED_TYPES):
+            continue
+        if not is_root and stop and isinstance(current, stop):
+            continue
+        if weight > 1.0 and sys.getrefcount(current) > SHARED_REFCOUNT:
+            # Widely referenced objects (interned strings, None, shared labels) are
+            # counted once rather than once per sampled reference
+            weight = 1.0
+        seen.add(id(current))
+        size = sys.getsizeof(current)
+        if isinstance(current, LEAF_TYPES):
+            total += size * weight
+            continue
+        children, scale = _referents(current, sample)
+        total += (size + _instance_overhead(current, children)) * weight
+        stack.extend((child, weight * scale, False) for child in children)
+    return int(total)
+
+
+def deep_sizeof(obj: Any, sample: int = 64, stop: Tuple[type, ...] = ()) -> int:
+    """Estimated bytes held by obj and everything it references.
+
+    Objects of a ``stop`` type are not counted or followed (except obj itself),
+    which keeps shared objects such as readings out of a component's total.
+    """
+    return _walk([(obj, 1.0, True)], sample, stop)
+
+
+def _sampled_nodes(nodes: List[Any], count: int, payload: str, sample: int,
+                   stop: Tuple[type, ...]) -> int:
+    """Scale the shells and payloads of sampled nodes up to count nodes."""
+    if not nodes:
+        return 0
+    scale = count / len(nodes)
+    shells = 0
+    for node in nodes:
+        referents = gc.get_referents(node)
+        shells += sys.getsizeof(node) + _instance_overhead(node, referents)
+        shells += sum(sys.getsizeof(value) for value in referents if type(value) is list)
+    payloads = _walk([(getattr(node, payload), scale, False) for node in nodes], sample, stop)
+    return int(shells * scale) + payloads
+
+
+def chain_sizeof(head: Any, count: Optional[int] = None, payload: str = "data", sample: int = 64,
+                 stop: Tuple[type, ...] = ()) -> Tuple[int, int]:
+    """(node count, estimated bytes) of a chain of nodes linked through ``next``.
+
+    The first ``sample`` nodes are measured and scaled up to count; if count is
+    not given, the chain is walked to count it.
+    """
+    nodes = []
+    node = head
+    while node is not None and len(nodes) < sample:
+        nodes.append(node)
+        node = node.next
+    if count is None:
+        count = len(nodes)
+        while node is not None:
+            count += 1
+            node = node.next
+    return count, _sampled_nodes(nodes, count, payload, sample, stop)
+
+
+def tree_sizeof(root: Any, children: Callable[[Any], Iterable[Any]], payload: str = "data",
+                sample: int = 64) -> Tuple[int, int]:
+    """(node count, estimated bytes) of a tree; children(node) yields a node's children.
+
+    Every node is visited to count it, but only the first ``sample`` are measured.
+    """
+    count, nodes = 0, []
+    stack = [root] if root is not None else []
+    while stack:
+        node = stack.pop()
+        count += 1
+        if len(nodes) < sample:
+            nodes.append(node)
+        stack.extend(children(node))
+    return count, _sampled_nodes(nodes, count, payload, sample, ())
@@ -0,0 +1,184 @@
+"""Lightweight counters, gauges and histograms for the energy tracker.
+
+Instrumented code checks ``metrics.enabled`` before doing any work, so the cost
+while disabled is a single attribute lookup. Enable with ``metrics.enable()`` and
+export with ``write_prometheus(path)`` or ``serve_prometheus(port)``.
+"""
+import bisect
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Seconds; suited to per-reading and per-task latencies
+DEFAULT_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+                   0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Registry of every metric, keyed by name and label set."""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.help: Dict[str, str] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def describe(self, name: str, help_text: str) -> None:
+        self.help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.gauges.setdefault(name, {})[key] = value
+
+    def add_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.gauges.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def get(self, name: str, **labels: str) -> Optional[float]:
+        """Current value of a counter or gauge, mainly for tests and dashboards."""
+        key = tuple(sorted(labels.items()))
+        for family in (self.counters, self.gauges):
+            if name in family and key in family[name]:
+                return family[name][key]
+        return None
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self.lock:
+            for kind, family in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(family.items()):
+                    self._header(lines, name, kind)
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for name, series in sorted(self.histograms.items()):
+                self._header(lines, name, "histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        labels = _format_labels(key + (("le", _format_value(bound)),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(key + (("le", "+Inf"),))
+                    lines.append(f"{name}_bucket{labels} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(histogram.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: List[str], name: str, kind: str) -> None:
+        if name in self.help:
+            lines.append(f"# HELP {name} {self.help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{label}="{_escape(str(value))}"' for label, value in key) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+metrics = Metrics()
+metrics.describe("energy_readings_ingested_total", "Readings accepted by EnergyTrackingSystem.add_reading.")
+metrics.describe("energy_readings_rejected_total", "Readings rejected because their zone does not exist.")
+metrics.describe("energy_readings_late_total", "Readings later than the reorder watermark, patched in by the correction path.")
+metrics.describe("energy_readings_duplicate_total", "Readings dropped as a repeated (device_id, timestamp).")
+metrics.describe("energy_alerts_total", "Threshold and goal alerts raised, by priority.")
+metrics.describe("energy_alerts_dropped_total", "Queued alerts dropped because nobody drained the alert queue.")
+metrics.describe("energy_add_reading_seconds", "Time spent in EnergyTrackingSystem.add_reading.")
+metrics.describe("energy_tasks_enqueued_total", "Processing tasks enqueued, by task type.")
+metrics.describe("energy_tasks_processed_total", "Processing tasks processed, by task type.")
+metrics.describe("energy_pending_tasks", "Processing tasks waiting in queues, by task type.")
+metrics.describe("energy_tasks_failed_total", "Processing tasks whose batch handler raised, by task type.")
+metrics.describe("energy_handler_batch_seconds", "Time each batch handler call takes, by task type.")
+metrics.describe("energy_task_latency_seconds", "Time from enqueue to processing, by task type.")
+metrics.describe("energy_zone_drain_seconds", "Time process_all_pending spends draining each zone.")
+metrics.describe("energy_zone_drained_tasks", "Tasks drained from each zone by the last process_all_pending.")
+metrics.describe("energy_query_cache_hits_total", "Query results served from the cache, by query.")
+metrics.describe("energy_query_cache_misses_total", "Query results computed because they were not cached, by query.")
+
+
+def write_prometheus(path: str, registry: Metrics = metrics) -> None:
+    """Atomically write the registry to a file, e.g. for the node_exporter textfile collector."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as output:
+        output.write(registry.to_prometheus())
+    os.replace(temporary, path)
+
+
+def serve_prometheus(port: int = 9108, host: str = "127.0.0.1", registry: Metrics = metrics) -> "HTTPServer":
+    """Serve the registry on /metrics from a background thread."""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,117 @@
+"""LRU cache for dashboard queries with targeted invalidation.
+
+Every cached result is tagged with what it depends on: ``("zone", name)`` for
+zone totals, ``("day", date)`` for time-ranged queries and ``("all",)`` for
+queries over the whole history. A new reading only invalidates entries carrying
+one of its tags, so unrelated zones and days stay cached.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Set, Tuple
+
+from .metrics import metrics
+
+Tag = Tuple[Any, ...]
+ALL_TAG: Tag = ("all",)
+
+
+def day_tags(start: datetime, end: datetime) -> List[Tag]:
+    """Tags for every day touched by the half-open range [start, end)."""
+    if end <= start:
+        return []
+    last = (end - timedelta(microseconds=1)).date()
+    day = start.date()
+    tags = []
+    while day <= last:
+        tags.append(("day", day))
+        day += timedelta(days=1)
+    return tags
+
+
+def reading_tags(zone_path: Iterable[str], timestamp: datetime) -> List[Tag]:
+    """Tags a reading in the given zone (and its ancestors) at timestamp invalidates."""
+    return [("zone", zone) for zone in zone_path] + [("day", timestamp.date()), ALL_TAG]
+
+
+class QueryCache:
+    def __init__(self, max_entries: int = 1024, max_items: int = 1_000_000):
+        """Keep at most max_entries results holding max_items values between them."""
+        self.max_entries = max_entries
+        self.max_items = max_items
+        self.entries: "OrderedDict[Hashable, Tuple[Any, int, Tuple[Tag, ...]]]" = OrderedDict()
+        self.tag_index: Dict[Tag, Set[Hashable]] = {}
+        self.items = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            if metrics.enabled:
+                metrics.inc("energy_query_cache_misses_total", query=str(key[0]))
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        if metrics.enabled:
+            metrics.inc("energy_query_cache_hits_total", query=str(key[0]))
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[Tag]) -> None:
+        if key in self.entries:
+            self._remove(key)
+        cost = len(value) if hasattr(value, "__len__") else 1
+        if cost > self.max_items:
+            return
+        tags = tuple(tags)
+        self.entries[key] = (value, cost, tags)
+        self.items += cost
+        for tag in tags:
+            self.tag_index.setdefault(tag, set()).add(key)
+        while len(self.entries) > self.max_entries or self.items > self.max_items:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, cost, tags = self.entries.pop(key)
+        self.items -= cost
+        for tag in tags:
+            keys = self.tag_index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tag_index[tag]
+
+    def invalidate(self, tags: Iterable[Tag]) -> int:
+        """Drop every entry carrying any of the tags; returns how many were dropped."""
+        dropped = 0
+        for tag in tags:
+            keys = self.tag_index.get(tag)
+            if not keys:
+                continue
+            for key in list(keys):
+                if key in self.entries:
+                    self._remove(key)
+                    dropped += 1
+        self.invalidations += dropped
+        return dropped
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.tag_index.clear()
+        self.items = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "items": self.items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,69 @@
+"""Circular queue for live sensor data and a simple FIFO task queue."""
+
+class CircularQueue:
+    def __init__(self, size):
+        self.size = size
+        self.queue = [None] * size
+        self.front = -1
+        self.rear = -1
+
+    def enqueue(self, data):
+        if (self.rear + 1) % self.size == self.front:
+            print("Queue is full")
+            return False
+
+        if self.front == -1:
+            self.front = 0
+
+        self.rear = (self.rear + 1) % self.size
+        self.queue[self.rear] = data
+        return True
+
+    def dequeue(self):
+        if self.front == -1:
+            print("Queue is empty")
+            return None
+
+        data = self.queue[self.front]
+        if self.front == self.rear:
+            self.front = self.rear = -1
+        else:
+            self.front = (self.front + 1) % self.size
+        return data
+
+    def display(self):
+        if self.front == -1:
+            print("Queue is empty")
+            return
+
+        idx = self.front
+        while True:
+            print(self.queue[idx], end=' <- ' if (idx != self.rear) else '\n')
+            if idx == self.rear:
+                break
+            idx = (idx + 1) % self.size
+
+    def memory_report(self, sample=64):
+        """Capacity, items held and estimated deep size in bytes."""
+        from .memory import deep_sizeof
+        items = 0 if self.front == -1 else (self.rear - self.front) % self.size + 1
+        return {"capacity": self.size, "items": items, "bytes": deep_sizeof(self, sample)}
+
+class Queue:
+    def __init__(self):
+        self.items = []
+
+    def enqueue(self, data):
+        self.items.append(data)
+
+    def dequeue(self):
+        if self.is_empty():
+            print("Queue is empty")
+            return None
+        return self.items.pop(0)
+
+    def is_empty(self):
+        return len(self.items) == 0
+
+    def display(self):
+        print(" <- ".join(map(str, self.items)))
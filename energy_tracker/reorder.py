@@ -0,0 +1,62 @@
+"""Watermarked reorder buffer for readings that arrive out of order.
+
+Readings are held in a min-heap by timestamp until the watermark (the newest
+timestamp seen minus the allowed lateness) passes them, then released in
+timestamp order. A reading older than something already released is "late"
+and is handed back separately so the caller can patch its rollups instead of
+appending it out of order. The heap never holds more than ``max_buffered``
+readings; beyond that the oldest are released early.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, List, Optional, Tuple
+
+from .tracking import EnergyReading
+
+# (reading, zone_name)
+Released = Tuple[EnergyReading, Any]
+
+
+class ReorderBuffer:
+    def __init__(self, lateness: timedelta = timedelta(minutes=5), max_buffered: int = 100_000):
+        self.lateness = lateness
+        self.max_buffered = max_buffered
+        self.heap: List[Tuple[datetime, int, EnergyReading, Any]] = []
+        self.arrivals = count()
+        self.max_seen: Optional[datetime] = None
+        self.last_released: Optional[datetime] = None
+        self.late_count = 0
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    @property
+    def watermark(self) -> Optional[datetime]:
+        return self.max_seen - self.lateness if self.max_seen is not None else None
+
+    def push(self, reading: EnergyReading, zone_name: Any = None) -> Tuple[List[Released], List[Released]]:
+        """Add a reading; returns (readings released in order, late readings)."""
+        if self.last_released is not None and reading.timestamp < self.last_released:
+            self.late_count += 1
+            return [], [(reading, zone_name)]
+
+        heapq.heappush(self.heap, (reading.timestamp, next(self.arrivals), reading, zone_name))
+        if self.max_seen is None or reading.timestamp > self.max_seen:
+            self.max_seen = reading.timestamp
+
+        released = []
+        watermark = self.watermark
+        while self.heap and (self.heap[0][0] <= watermark or len(self.heap) > self.max_buffered):
+            released.append(self._pop())
+        return released, []
+
+    def _pop(self) -> Released:
+        timestamp, _, reading, zone_name = heapq.heappop(self.heap)
+        self.last_released = timestamp
+        return reading, zone_name
+
+    def flush(self) -> List[Released]:
+        """Release everything still buffered, in timestamp order."""
+        return [self._pop() for _ in range(len(self.heap))]
@@ -0,0 +1,323 @@
+"""Indexed alert thresholds and energy-saving goals.
+
+Two kinds of rule are supported:
+
+- ``ThresholdRule`` fires for a single reading whose consumption falls in
+  ``[low, high)``, e.g. abnormal usage above 5 kWh. Rules are indexed per scope
+  (a device, a zone including the zones below it, or everything) in a centred
+  interval tree, so a reading is only compared with the rules whose range
+  contains its value.
+- ``Goal`` is an energy-saving budget: it fires once when a scope's running
+  consumption for the current hour, day or month crosses ``limit``. Limits are
+  kept sorted per scope and period, so a reading finds every crossed goal with
+  two bisections.
+
+Alerts are pushed onto a priority queue, most urgent first. Consumers are
+expected to drain it (``EnergyTrackingSystem.drain_alerts``). If they fall
+behind, the queue is trimmed back to ``max_alerts`` whenever it grows an
+eighth past that, dropping the least urgent (then newest) alerts, so memory
+stays bounded.
+"""
+
+import heapq
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import count
+from operator import attrgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .metrics import metrics
+from .tracking import EnergyReading, Priority
+
+INF = float("inf")
+PERIODS = ("hour", "day", "month")
+ScopeKey = Tuple[str, ...]  # ("device", id), ("zone", name) or ("all",)
+ALL_SCOPE: ScopeKey = ("all",)
+
+
+@dataclass
+class ThresholdRule:
+    rule_id: str
+    low: float = -INF
+    high: float = INF
+    device_id: Optional[str] = None
+    zone_name: Optional[str] = None
+    priority: Priority = Priority.HIGH
+    message: str = ""
+
+
+@dataclass
+class Goal:
+    goal_id: str
+    limit: float
+    period: str = "day"
+    device_id: Optional[str] = None
+    zone_name: Optional[str] = None
+    priority: Priority = Priority.MEDIUM
+    message: str = ""
+
+
+@dataclass(order=True)
+class Alert:
+    sort_key: Tuple[int, int] = field(repr=False)
+    rule_id: str = field(compare=False)
+    priority: Priority = field(compare=False)
+    reading: EnergyReading = field(compare=False)
+    zone_name: Optional[str] = field(compare=False)
+    value: float = field(compare=False)  # the reading's consumption, or the goal's running total
+    message: str = field(compare=False, default="")
+
+
+def _scope(device_id: Optional[str], zone_name: Optional[str]) -> ScopeKey:
+    # Device rules are the most selective, so index by device when both are given
+    if device_id is not None:
+        return ("device", device_id)
+    if zone_name is not None:
+        return ("zone", zone_name)
+    return ALL_SCOPE
+
+
+def period_bucket(period: str, timestamp: datetime) -> Tuple[int, ...]:
+    if period == "hour":
+        return timestamp.year, timestamp.month, timestamp.day, timestamp.hour
+    if period == "day":
+        return timestamp.year, timestamp.month, timestamp.day
+    return timestamp.year, timestamp.month
+
+
+class _Indexed(NamedTuple):
+    """A rule with its bounds as of when it was indexed."""
+    low: float
+    high: float
+    rule: ThresholdRule
+
+
+class _IntervalNode:
+    __slots__ = ("center", "by_low", "by_high", "left", "right")
+
+    def __init__(self, entries: List[_Indexed]):
+        lows = sorted(entry.low for entry in entries)
+        # A median low always belongs to some interval, so every node holds at least one entry
+        self.center = center = lows[len(lows) // 2]
+        here, left, right = [], [], []
+        for entry in entries:
+            if entry.high <= center:
+                left.append(entry)
+            elif entry.low > center:
+                right.append(entry)
+            else:
+                here.append(entry)
+        self.by_low = sorted(here, key=lambda entry: entry.low)
+        self.by_high = sorted(here, key=lambda entry: entry.high, reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+
+class IntervalIndex:
+    """Rules whose [low, high) contains a value, in O(log n + matches).
+
+    Additions go to a small pending list and removals to a tombstone set; the
+    tree is rebuilt once either grows past a fraction of the indexed rules.
+    Each addition is a fresh entry, so a rule removed, edited and added again
+    is indexed by its new bounds while its old entry stays hidden.
+    """
+
+    def __init__(self):
+        self.root: Optional[_IntervalNode] = None
+        self.indexed = 0
+        self.pending: List[_Indexed] = []
+        self.removed: Set[int] = set()  # ids of dead entries still in the tree or pending list
+        self.entries: Dict[int, _Indexed] = {}  # id(rule) -> its live entry
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, rule: ThresholdRule) -> None:
+        self.remove(rule)
+        entry = self.entries[id(rule)] = _Indexed(rule.low, rule.high, rule)
+        self.pending.append(entry)
+        if len(self.pending) > 32 + self.indexed // 8:
+            self.rebuild()
+
+    def remove(self, rule: ThresholdRule) -> None:
+        entry = self.entries.pop(id(rule), None)
+        if entry is None:
+            return
+        self.removed.add(id(entry))
+        if len(self.removed) > 32 + self.indexed // 4:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        entries = list(self.entries.values())
+        self.root = _IntervalNode(entries) if entries else None
+        self.indexed = len(entries)
+        self.pending = []
+        self.removed = set()
+
+    def stab(self, value: float) -> List[ThresholdRule]:
+        matches = []
+        node = self.root
+        while node is not None:
+            if value < node.center:
+                for entry in node.by_low:
+                    if entry.low > value:
+                        break
+                    matches.append(entry)
+                node = node.left
+            else:
+                for entry in node.by_high:
+                    if entry.high <= value:
+                        break
+                    matches.append(entry)
+                node = node.right if value > node.center else None
+        matches.extend(entry for entry in self.pending if entry.low <= value < entry.high)
+        if self.removed:
+            return [entry.rule for entry in matches if id(entry) not in self.removed]
+        return [entry.rule for entry in matches]
+
+
+class _GoalLimits:
+    """Goals of one scope and period, sorted by limit, plus the running total."""
+
+    __slots__ = ("goals", "limits", "dirty", "bucket", "total")
+
+    def __init__(self):
+        self.goals: List[Goal] = []
+        self.limits: List[float] = []
+        self.dirty = False
+        self.bucket: Optional[Tuple[int, ...]] = None
+        self.total = 0.0
+
+    def crossed(self, previous: float, total: float) -> List[Goal]:
+        if self.dirty:
+            self.goals.sort(key=lambda goal: goal.limit)
+            self.limits = [goal.limit for goal in self.goals]
+            self.dirty = False
+        # Goals with previous < limit <= total
+        first = bisect_right(self.limits, previous)
+        last = bisect_right(self.limits, total)
+        return self.goals[first:last]
+
+
+class RuleEngine:
+    def __init__(self, max_alerts: int = 10_000):
+        if max_alerts < 1:
+            raise ValueError("max_alerts must be at least 1")
+        self.max_alerts = max_alerts
+        self.dropped_alerts = 0
+        self.thresholds: Dict[ScopeKey, IntervalIndex] = {}
+        self.goals: Dict[Tuple[ScopeKey, str], _GoalLimits] = {}
+        self.rules: Dict[str, Union[ThresholdRule, Goal]] = {}
+        self.alerts: List[Alert] = []
+        self.sequence = count()
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add_rule(self, rule: Union[ThresholdRule, Goal]) -> None:
+        """Add or replace a threshold rule or goal, keyed by its id."""
+        if isinstance(rule, ThresholdRule):
+            if not rule.low < rule.high:
+                raise ValueError(f"Rule '{rule.rule_id}' has an empty range [{rule.low}, {rule.high})")
+            self.remove_rule(rule.rule_id)
+            self.rules[rule.rule_id] = rule
+            scope = _scope(rule.device_id, rule.zone_name)
+            index = self.thresholds.get(scope)
+            if index is None:
+                index = self.thresholds[scope] = IntervalIndex()
+            index.add(rule)
+        else:
+            if rule.period not in PERIODS:
+                raise ValueError(f"Unknown goal period '{rule.period}', expected one of {PERIODS}")
+            if rule.device_id is not None and rule.zone_name is not None:
+                raise ValueError(f"Goal '{rule.goal_id}' can track a device or a zone, not both")
+            self.remove_rule(rule.goal_id)
+            self.rules[rule.goal_id] = rule
+            key = (_scope(rule.device_id, rule.zone_name), rule.period)
+            limits = self.goals.get(key)
+            if limits is None:
+                limits = self.goals[key] = _GoalLimits()
+            limits.goals.append(rule)
+            limits.dirty = True
+
+    def remove_rule(self, rule_id: str) -> bool:
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return False
+        if isinstance(rule, ThresholdRule):
+            self.thresholds[_scope(rule.device_id, rule.zone_name)].remove(rule)
+        else:
+            limits = self.goals[(_scope(rule.device_id, rule.zone_name), rule.period)]
+            limits.goals = [goal for goal in limits.goals if goal is not rule]
+            limits.dirty = True
+        return True
+
+    def evaluate(self, reading: EnergyReading, zone_path: Iterable[str] = (),
+                 zone_name: Optional[str] = None) -> List[Alert]:
+        """Check a reading against the rules that could fire and queue the alerts.
+
+        ``zone_path`` is the reading's zone and its ancestors, so zone rules also
+        cover every zone below them.
+        """
+        zone_path = list(zone_path)
+        if zone_name is None and zone_path:
+            zone_name = zone_path[0]
+        scopes = [("device", reading.device_id)] + [("zone", zone) for zone in zone_path] + [ALL_SCOPE]
+        value = reading.consumption
+        fired = []
+
+        for scope in scopes:
+            index = self.thresholds.get(scope)
+            if index is None:
+                continue
+            for rule in index.stab(value):
+                if rule.device_id is not None and rule.zone_name is not None and rule.zone_name not in zone_path:
+                    continue
+                fired.append(self._alert(rule.rule_id, rule.priority, reading, zone_name, value, rule.message))
+
+        if self.goals:
+            for scope in scopes:
+                for period in PERIODS:
+                    limits = self.goals.get((scope, period))
+                    if limits is None:
+                        continue
+                    bucket = period_bucket(period, reading.timestamp)
+                    if limits.bucket is None or bucket > limits.bucket:
+                        limits.bucket, limits.total = bucket, 0.0
+                    elif bucket < limits.bucket:
+                        continue  # Too late to count toward an earlier period
+                    previous = limits.total
+                    limits.total += value
+                    for goal in limits.crossed(previous, limits.total):
+                        fired.append(self._alert(goal.goal_id, goal.priority, reading, zone_name,
+                                                 limits.total, goal.message))
+        return fired
+
+    def _alert(self, rule_id: str, priority: Priority, reading: EnergyReading, zone_name: Optional[str],
+               value: float, message: str) -> Alert:
+        alert = Alert((-priority.value, next(self.sequence)), rule_id, priority, reading, zone_name, value, message)
+        heapq.heappush(self.alerts, alert)
+        if len(self.alerts) > self.max_alerts + self.max_alerts // 8:
+            self._trim_alerts()
+        return alert
+
+    def _trim_alerts(self) -> None:
+        # Trimming in bulk once past a slack of 1/8 keeps the cost per alert O(log n)
+        dropped = len(self.alerts) - self.max_alerts
+        self.alerts.sort(key=attrgetter("sort_key"))  # a sorted list is still a heap
+        del self.alerts[self.max_alerts:]
+        self.dropped_alerts += dropped
+        if metrics.enabled:
+            metrics.inc("energy_alerts_dropped_total", dropped)
+
+    def pending_alerts(self) -> int:
+        return len(self.alerts)
+
+    def next_alert(self) -> Optional[Alert]:
+        """Pop the most urgent alert (highest priority, then oldest)."""
+        return heapq.heappop(self.alerts) if self.alerts else None
+
+    def drain_alerts(self) -> List[Alert]:
+        """Pop every queued alert in priority order."""
+        return [heapq.heappop(self.alerts) for _ in range(len(self.alerts))]
@@ -0,0 +1,216 @@
+"""Hash-sharded EnergyTrackingSystem that spreads households over worker processes.
+
+Each household maps to a shard through a crc32 hash that is stable across
+processes. Each shard is a worker process holding one EnergyTrackingSystem per
+household. The router partitions ingest batches by shard and sends every shard
+its part before gathering the replies, so shards work on a batch concurrently;
+a single add_reading pays a full pipe round trip. Queries spanning households
+gather one small reply per shard.
+"""
+
+import multiprocessing
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .tracking import EnergyReading, EnergyTrackingSystem, Priority
+
+# (household_id, zone_name, reading)
+IngestItem = Tuple[str, str, EnergyReading]
+
+
+def shard_for(household_id: str, num_shards: int) -> int:
+    """Map a household to a shard using a hash that is stable across processes."""
+    return zlib.crc32(household_id.encode("utf-8")) % num_shards
+
+
+class ShardWorker:
+    """Owns the trackers for every household assigned to one shard."""
+
+    def __init__(self, recent_readings_capacity: int = 24):
+        self.recent_readings_capacity = recent_readings_capacity
+        self.households: Dict[str, EnergyTrackingSystem] = {}
+
+    def get_tracker(self, household_id: str) -> EnergyTrackingSystem:
+        tracker = self.households.get(household_id)
+        if tracker is None:
+            tracker = EnergyTrackingSystem(self.recent_readings_capacity)
+            self.households[household_id] = tracker
+        return tracker
+
+    def add_zone(self, household_id: str, zone_name: str, parent_name: str) -> bool:
+        return self.get_tracker(household_id).hierarchy.add_zone(zone_name, parent_name)
+
+    def add_readings(self, batch: List[IngestItem]) -> int:
+        """Add a batch of readings, returning how many were accepted."""
+        accepted = 0
+        for household_id, zone_name, reading in batch:
+            if self.get_tracker(household_id).add_reading(reading, zone_name):
+                accepted += 1
+        return accepted
+
+    def process_all_pending(self) -> Dict[str, dict]:
+        """Drain every household and summarise the processed task counts."""
+        summary = {}
+        for household_id, tracker in self.households.items():
+            results = tracker.process_all_pending()
+            summary[household_id] = {
+                'system': len(results['system']),
+                'zones': {zone: len(tasks) for zone, tasks in results['zones'].items()},
+            }
+        return summary
+
+    def zone_consumption(self, household_id: str, zone_name: str) -> Optional[float]:
+        tracker = self.households.get(household_id)
+        if tracker is None or zone_name not in tracker.hierarchy.node_map:
+            return None
+        return tracker.hierarchy.node_map[zone_name].total_consumption
+
+    def total_consumption(self) -> float:
+        """Sum of each household's running root-zone total, without walking any history."""
+        return sum(tracker.get_zone_total(tracker.hierarchy.root.name) for tracker in self.households.values())
+
+    def household_count(self) -> int:
+        return len(self.households)
+
+
+def _worker_loop(conn, recent_readings_capacity: int) -> None:
+    """Serve commands from the router until told to stop."""
+    worker = ShardWorker(recent_readings_capacity)
+    while True:
+        command, args = conn.recv()
+        if command == "stop":
+            conn.send((True, None))
+            break
+        try:
+            conn.send((True, getattr(worker, command)(*args)))
+        except Exception as exc:
+            conn.send((False, exc))
+    conn.close()
+
+
+class ShardedEnergyTrackingSystem:
+    """Routes households to worker processes, each owning its own trackers."""
+
+    def __init__(self, num_shards: Optional[int] = None, recent_readings_capacity: int = 24,
+                 start_method: Optional[str] = None):
+        self.num_shards = num_shards or multiprocessing.cpu_count()
+        context = multiprocessing.get_context(start_method)
+        self.connections = []
+        self.processes = []
+        for _ in range(self.num_shards):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_loop,
+                args=(child_conn, recent_readings_capacity),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+    def _call(self, shard: int, command: str, *args) -> Any:
+        self.connections[shard].send((command, args))
+        return self._receive(shard)
+
+    def _receive(self, shard: int) -> Any:
+        ok, result = self.connections[shard].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _scatter(self, command: str, per_shard_args: Dict[int, tuple]) -> Dict[int, Any]:
+        """Send a command to several shards at once, then gather the replies."""
+        for shard, args in per_shard_args.items():
+            self.connections[shard].send((command, args))
+        return {shard: self._receive(shard) for shard in per_shard_args}
+
+    def _broadcast(self, command: str) -> List[Any]:
+        return list(self._scatter(command, {shard: () for shard in range(self.num_shards)}).values())
+
+    def add_zone(self, household_id: str, zone_name: str, parent_name: str) -> bool:
+        """Add a zone to a household's hierarchy on its owning shard."""
+        return self._call(shard_for(household_id, self.num_shards), "add_zone",
+                          household_id, zone_name, parent_name)
+
+    def add_reading(self, household_id: str, reading: EnergyReading, zone_name: str) -> bool:
+        """Add a single reading; prefer add_readings for throughput."""
+        return self.add_readings([(household_id, zone_name, reading)]) == 1
+
+    def add_readings(self, batch: List[IngestItem]) -> int:
+        """Partition a batch by household and ingest it on all shards in parallel."""
+        partitions = defaultdict(list)
+        for item in batch:
+            partitions[shard_for(item[0], self.num_shards)].append(item)
+        replies = self._scatter("add_readings", {shard: (items,) for shard, items in partitions.items()})
+        return sum(replies.values())
+
+    def process_all_pending(self) -> Dict[str, dict]:
+        """Process pending tasks on every shard and merge the per-household summaries."""
+        merged = {}
+        for summary in self._broadcast("process_all_pending"):
+            merged.update(summary)
+        return merged
+
+    def get_zone_consumption(self, household_id: str, zone_name: str) -> Optional[float]:
+        return self._call(shard_for(household_id, self.num_shards), "zone_consumption",
+                          household_id, zone_name)
+
+    def get_total_consumption(self) -> float:
+        return sum(self._broadcast("total_consumption"))
+
+    def get_household_count(self) -> int:
+        return sum(self._broadcast("household_count"))
+
+    def close(self) -> None:
+        """Stop every worker process."""
+        for shard, conn in enumerate(self.connections):
+            if self.processes[shard].is_alive():
+                conn.send(("stop", ()))
+                self._receive(shard)
+            conn.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self) -> 'ShardedEnergyTrackingSystem':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# Example usage and testing
+def main():
+    households = [f"household_{i}" for i in range(8)]
+
+    with ShardedEnergyTrackingSystem(num_shards=2) as system:
+        for household in households:
+            system.add_zone(household, "Floor 1", "Building")
+            system.add_zone(household, "Room 101", "Floor 1")
+
+        batch = [
+            (household, "Room 101", EnergyReading(
+                timestamp=datetime.now(),
+                consumption=2.5,
+                device_id=f"device_{i}",
+                reading_type="peak",
+                priority=Priority.MEDIUM
+            ))
+            for household in households
+            for i in range(3)
+        ]
+        accepted = system.add_readings(batch)
+        results = system.process_all_pending()
+
+        print(f"Readings accepted: {accepted}")
+        print(f"Households tracked: {system.get_household_count()}")
+        print(f"Total consumption: {system.get_total_consumption()} kWh")
+        for household, summary in sorted(results.items()):
+            print(f"{household}: {summary['system']} system tasks, zones {summary['zones']}")
+
+if __name__ == "__main__":
+    main()
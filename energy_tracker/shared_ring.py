@@ -0,0 +1,180 @@
+"""Lock-free ring of recent readings in shared memory for other processes.
+
+One process (typically the tracker) appends readings into fixed-width slots;
+dashboards and other readers attach to the segment by name and copy out the
+latest readings without any lock or IPC round trip. Timestamps are stored like
+the write-ahead log's: wall-clock microseconds plus the UTC offset, so naive
+readings come back unchanged and aware ones as the same instant. Device ids are
+limited to 32 bytes and reading types to 15 bytes of UTF-8.
+"""
+
+import multiprocessing
+import struct
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional
+
+from .tracking import EnergyReading, Priority
+from .wal import decode_timestamp, encode_timestamp
+
+# Header: magic, capacity, number of readings ever written
+HEADER = struct.Struct("<4s4xQQ")
+# Slot: sequence, write index, wall-clock microseconds, UTC offset in seconds, consumption,
+# priority, device_id, reading_type
+SLOT = struct.Struct("<QQqidB32s15s")
+SEQUENCE = struct.Struct("<Q")
+MAGIC = b"ERB2"
+WRITTEN_OFFSET = 16
+MAX_READ_RETRIES = 8
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without letting this process's tracker unlink it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedEnergyRingBuffer:
+    """Fixed-width ring of recent readings in shared memory.
+
+    A single writer overwrites the oldest slot once the ring is full. Every slot
+    carries its own sequence number (odd while being written), so readers in other
+    processes copy the latest readings without taking a lock and simply skip a
+    slot the writer lapped while they were reading it.
+    """
+
+    def __init__(self, capacity: int = 24, name: Optional[str] = None, create: bool = True):
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER.size + capacity * SLOT.size)
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, capacity, 0)
+        else:
+            self.shm = _attach_untracked(name)
+            magic, capacity, _ = HEADER.unpack_from(self.shm.buf, 0)
+            if magic != MAGIC:
+                self.shm.close()
+                raise ValueError(f"Shared memory segment '{name}' is not an energy ring buffer")
+        self.capacity = capacity
+        self.owner = create
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedEnergyRingBuffer':
+        """Open an existing buffer created by another process for reading."""
+        return cls(name=name, create=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _written(self) -> int:
+        return SEQUENCE.unpack_from(self.shm.buf, WRITTEN_OFFSET)[0]
+
+    def _slot_offset(self, index: int) -> int:
+        return HEADER.size + (index % self.capacity) * SLOT.size
+
+    def append(self, reading: EnergyReading) -> bool:
+        """Write a reading into the next slot. Only one process may write."""
+        device_id = reading.device_id.encode("utf-8")
+        reading_type = reading.reading_type.encode("utf-8")
+        if len(device_id) > 32 or len(reading_type) > 15:
+            return False
+
+        micros, utc_offset = encode_timestamp(reading.timestamp)
+        buf = self.shm.buf
+        index = self._written()
+        offset = self._slot_offset(index)
+        sequence = SEQUENCE.unpack_from(buf, offset)[0]
+        SEQUENCE.pack_into(buf, offset, sequence + 1)
+        SLOT.pack_into(
+            buf, offset, sequence + 1, index,
+            micros, utc_offset, reading.consumption,
+            reading.priority.value, device_id, reading_type,
+        )
+        SEQUENCE.pack_into(buf, offset, sequence + 2)
+        SEQUENCE.pack_into(buf, WRITTEN_OFFSET, index + 1)
+        return True
+
+    def _read_slot(self, index: int) -> Optional[EnergyReading]:
+        buf = self.shm.buf
+        offset = self._slot_offset(index)
+        for _ in range(MAX_READ_RETRIES):
+            before = SEQUENCE.unpack_from(buf, offset)[0]
+            if before % 2:
+                continue
+            fields = SLOT.unpack_from(buf, offset)
+            if SEQUENCE.unpack_from(buf, offset)[0] != before:
+                continue
+            _, slot_index, micros, utc_offset, consumption, priority, device_id, reading_type = fields
+            if slot_index != index:
+                # The writer has already lapped this slot
+                return None
+            return EnergyReading(
+                timestamp=decode_timestamp(micros, utc_offset),
+                consumption=consumption,
+                device_id=device_id.rstrip(b"\0").decode("utf-8"),
+                reading_type=reading_type.rstrip(b"\0").decode("utf-8"),
+                priority=Priority(priority),
+            )
+        return None
+
+    def latest(self, n: Optional[int] = None) -> List[EnergyReading]:
+        """Return up to n of the most recent readings, oldest first."""
+        written = self._written()
+        n = self.capacity if n is None else min(n, self.capacity)
+        readings = []
+        for index in range(max(0, written - n), written):
+            reading = self._read_slot(index)
+            if reading is not None:
+                readings.append(reading)
+        return readings
+
+    def __len__(self) -> int:
+        return min(self._written(), self.capacity)
+
+    def close(self) -> None:
+        self.shm.close()
+
+    def unlink(self) -> None:
+        """Remove the segment; only the creating process should call this."""
+        if self.owner:
+            self.shm.unlink()
+
+
+def _dashboard_reader(name: str, count: int, results) -> None:
+    buffer = SharedEnergyRingBuffer.attach(name)
+    results.put([reading.device_id for reading in buffer.latest(count)])
+    buffer.close()
+
+
+# Example usage and testing
+def main():
+    buffer = SharedEnergyRingBuffer(capacity=5)
+    try:
+        for i in range(8):
+            buffer.append(EnergyReading(
+                timestamp=datetime.now(),
+                consumption=1.0 + i,
+                device_id=f"device_{i}",
+                reading_type="peak" if i % 2 else "off-peak",
+                priority=Priority.MEDIUM
+            ))
+
+        results = multiprocessing.Queue()
+        reader = multiprocessing.Process(target=_dashboard_reader, args=(buffer.name, 3, results))
+        reader.start()
+        print(f"Latest 3 readings seen by dashboard process: {results.get()}")
+        reader.join()
+        print(f"Readings held in ring: {len(buffer)}")
+    finally:
+        buffer.close()
+        buffer.unlink()
+
+if __name__ == "__main__":
+    main()
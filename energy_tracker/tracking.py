@@ -0,0 +1,789 @@
+"""Energy readings, processing queues and the EnergyTrackingSystem (topic 3)."""
+
+from dataclasses import dataclass
+from typing import Optional, Any, Dict, Iterable, List, Tuple
+from datetime import datetime, timedelta
+from contextlib import nullcontext
+from enum import Enum
+from queue import Empty, Queue as ProcessingQueue
+from time import perf_counter
+
+from .handlers import TaskHandler, TaskHandlerRegistry, task_handlers
+from .metrics import metrics
+from .query_cache import ALL_TAG, QueryCache, day_tags, reading_tags
+
+class Priority(Enum):
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+@dataclass
+class EnergyReading:
+    timestamp: datetime
+    consumption: float  # in kWh
+    device_id: str
+    reading_type: str  # e.g., "peak", "off-peak"
+    priority: Priority = Priority.MEDIUM
+
+    def __lt__(self, other):
+        return self.priority.value < other.priority.value
+
+@dataclass
+class ProcessingTask:
+    reading: EnergyReading
+    task_type: str
+    status: str = "pending"
+    processed_timestamp: Optional[datetime] = None
+    enqueued_at: Optional[float] = None  # perf_counter() value when queued (or recovered from the WAL)
+    sequence: Optional[int] = None  # write-ahead log sequence, only set in durable mode
+    error: Optional[str] = None
+    zone_name: Optional[str] = None
+    metered: bool = False  # counted in the energy_pending_tasks gauge
+    subscriber_errors: Optional[Dict[str, str]] = None  # subscriber task type -> error, for shared reading tasks
+
+class EnergyProcessingQueue:
+    def __init__(self, wal=None, handlers: Optional[TaskHandlerRegistry] = None):
+        """Pass an energy_tracker.wal.WriteAheadLog to make pending tasks survive a crash.
+
+        See energy_tracker.wal for when an enqueued task is durable.
+
+        Tasks are handed to the batch handlers in ``handlers``, which defaults to the
+        shared energy_tracker.handlers.task_handlers registry.
+        """
+        self.tasks = ProcessingQueue()
+        self.processing_history = []
+        self.wal = wal
+        self.handlers = handlers if handlers is not None else task_handlers
+        # Tasks drained from the queue but waiting for their batch to fill up
+        self.staged: Dict[str, List[ProcessingTask]] = {}
+        if wal is not None:
+            recovered_at = perf_counter()
+            for sequence, reading, task_type, zone_name in wal.take_recovered():
+                self.tasks.put(ProcessingTask(reading, task_type, enqueued_at=recovered_at, sequence=sequence,
+                                              zone_name=zone_name))
+        
+    def enqueue_task(self, reading: EnergyReading, task_type: str, zone_name: Optional[str] = None) -> None:
+        """Add a new processing task to the queue."""
+        task = ProcessingTask(reading, task_type, enqueued_at=perf_counter(), zone_name=zone_name)
+        if self.wal is not None:
+            task.sequence = self.wal.append_enqueue(reading, task_type, zone_name)
+        if metrics.enabled:
+            task.metered = True
+            metrics.inc("energy_tasks_enqueued_total", task_type=task_type)
+            metrics.add_gauge("energy_pending_tasks", 1, task_type=task_type)
+        self.tasks.put(task)
+        
+    def process_next_task(self) -> Optional[ProcessingTask]:
+        """Process the next task in the queue."""
+        if self.tasks.empty():
+            return None
+            
+        task = self.tasks.get()
+        self._complete([task], self.handlers.get(task.task_type))
+        return task
+
+    def process_batches(self, flush: bool = True) -> List[ProcessingTask]:
+        """Drain the queue and run each task type's handler on whole batches.
+
+        Full batches always run. A partial batch runs when ``flush`` is true or its
+        oldest task has waited longer than the handler's ``max_latency`` since it
+        was enqueued; otherwise it stays staged for the next call.
+        """
+        now = perf_counter()
+        while True:
+            try:
+                task = self.tasks.get_nowait()
+            except Empty:
+                break
+            staged = self.staged.get(task.task_type)
+            if staged is None:
+                staged = self.staged[task.task_type] = []
+            staged.append(task)
+
+        processed = []
+        for task_type in list(self.staged):
+            staged = self.staged[task_type]
+            entry = self.handlers.get(task_type)
+            if entry is None:
+                batches, remainder = [staged], []
+            else:
+                full = len(staged) - len(staged) % entry.batch_size
+                batches = [staged[i:i + entry.batch_size] for i in range(0, full, entry.batch_size)]
+                remainder = staged[full:]
+                # Tasks are staged in enqueue order, so the first one has waited longest
+                if remainder and (flush or now - remainder[0].enqueued_at >= entry.max_latency):
+                    batches.append(remainder)
+                    remainder = []
+            for batch in batches:
+                self._complete(batch, entry)
+                processed.extend(batch)
+            if remainder:
+                self.staged[task_type] = remainder
+            else:
+                del self.staged[task_type]
+        return processed
+
+    def _complete(self, batch: List[ProcessingTask], entry: Optional[TaskHandler]) -> None:
+        """Run the handler for one batch of same-type tasks and record the outcome."""
+        task_type = batch[0].task_type
+        status, error = "processed", None
+        started = perf_counter() if metrics.enabled else None
+        if entry is not None:
+            try:
+                entry.handler(batch)
+            except Exception as exc:
+                # Failed tasks are not marked complete in the WAL, so they are retried after a restart
+                status, error = "failed", repr(exc)
+        finished = datetime.now()
+        for task in batch:
+            task.status = status
+            task.error = error
+            task.processed_timestamp = finished
+            self.processing_history.append(task)
+            # A task a subscriber failed on stays outstanding in the WAL as well
+            if task.sequence is not None and status == "processed" and not task.subscriber_errors:
+                self.wal.append_complete(task.sequence)
+
+        if started is not None:
+            now = perf_counter()
+            metrics.observe("energy_handler_batch_seconds", now - started, task_type=task_type)
+            metrics.inc(f"energy_tasks_{status}_total", len(batch), task_type=task_type)
+            for task in batch:
+                if task.metered:
+                    metrics.add_gauge("energy_pending_tasks", -1, task_type=task_type)
+                    metrics.observe("energy_task_latency_seconds", now - task.enqueued_at,
+                                    task_type=task_type)
+        
+    def get_pending_tasks_count(self) -> int:
+        """Get count of pending tasks, including those staged for a batch."""
+        return self.tasks.qsize() + sum(len(staged) for staged in self.staged.values())
+        
+    def get_processing_history(self) -> List[ProcessingTask]:
+        """Get list of processed tasks."""
+        return self.processing_history
+
+class SelectionSortManager:
+    @staticmethod
+    def selection_sort_readings(readings: List[EnergyReading]) -> List[EnergyReading]:
+        """Sort energy readings using selection sort based on priority."""
+        n = len(readings)
+        for i in range(n):
+            max_idx = i
+            for j in range(i + 1, n):
+                if readings[j].priority.value > readings[max_idx].priority.value:
+                    max_idx = j
+            readings[i], readings[max_idx] = readings[max_idx], readings[i]
+        return readings
+
+class DoublyLinkedNode:
+    def __init__(self, reading: EnergyReading):
+        self.reading = reading
+        self.next: Optional[DoublyLinkedNode] = None
+        self.prev: Optional[DoublyLinkedNode] = None
+
+class EnergyTreeNode:
+    def __init__(self, name: str, parent_id: Optional[str] = None):
+        self.node_id = name
+        self.parent_id = parent_id
+        self.name = name
+        self.children: List[EnergyTreeNode] = []
+        self.readings: List[EnergyReading] = []
+        self.total_consumption = 0.0
+        self.processing_queue = EnergyProcessingQueue()
+
+    def add_child(self, child: 'EnergyTreeNode') -> None:
+        self.children.append(child)
+
+    def add_reading(self, reading: EnergyReading, queue_task: bool = True) -> None:
+        self.readings.append(reading)
+        self.total_consumption += reading.consumption
+        # Queue reading for processing
+        if queue_task:
+            self.processing_queue.enqueue_task(reading, "consumption_analysis", self.name)
+
+    def process_pending_readings(self) -> List[ProcessingTask]:
+        """Process all pending readings in the queue."""
+        return self.processing_queue.process_batches(flush=True)
+
+class EnergyHierarchyTree:
+    def __init__(self):
+        self.root = EnergyTreeNode("Building")
+        self.node_map = {"Building": self.root}
+
+    def add_zone(self, zone_name: str, parent_name: str) -> bool:
+        if parent_name not in self.node_map:
+            return False
+            
+        parent_node = self.node_map[parent_name]
+        new_node = EnergyTreeNode(zone_name, parent_name)
+        parent_node.add_child(new_node)
+        self.node_map[zone_name] = new_node
+        return True
+
+    def add_reading_to_zone(self, zone_name: str, reading: EnergyReading, queue_task: bool = True) -> bool:
+        """Add a reading to a specific zone."""
+        if zone_name not in self.node_map:
+            return False
+        self.node_map[zone_name].add_reading(reading, queue_task)
+        return True
+
+    def zone_path(self, zone_name: str) -> List[str]:
+        """Names of a zone and all of its ancestors up to the root."""
+        path = []
+        while zone_name is not None and zone_name in self.node_map:
+            path.append(zone_name)
+            zone_name = self.node_map[zone_name].parent_id
+        return path
+
+    def process_zone_readings(self, zone_name: str) -> List[ProcessingTask]:
+        """Process readings for a specific zone."""
+        if zone_name not in self.node_map:
+            return []
+        return self.node_map[zone_name].process_pending_readings()
+
+class EnergyConsumptionList:
+    def __init__(self):
+        self.head: Optional[DoublyLinkedNode] = None
+        self.tail: Optional[DoublyLinkedNode] = None
+        self.size = 0
+        self.processing_queue = EnergyProcessingQueue()
+
+    def add_reading(self, reading: EnergyReading, queue_task: bool = True) -> DoublyLinkedNode:
+        new_node = DoublyLinkedNode(reading)
+        
+        if not self.head:
+            self.head = new_node
+            self.tail = new_node
+        else:
+            new_node.prev = self.tail
+            self.tail.next = new_node
+            self.tail = new_node
+        
+        self.size += 1
+        # Queue reading for processing
+        if queue_task:
+            self.processing_queue.enqueue_task(reading, "historical_analysis")
+        return new_node
+
+    def insert_in_order(self, reading: EnergyReading, queue_task: bool = True) -> DoublyLinkedNode:
+        """Insert a reading at its timestamp position, searching back from the tail."""
+        current = self.tail
+        while current and current.reading.timestamp > reading.timestamp:
+            current = current.prev
+        if current is self.tail:
+            return self.add_reading(reading, queue_task)
+
+        new_node = DoublyLinkedNode(reading)
+        if current is None:
+            new_node.next = self.head
+            self.head.prev = new_node
+            self.head = new_node
+        else:
+            new_node.prev = current
+            new_node.next = current.next
+            current.next.prev = new_node
+            current.next = new_node
+        self.size += 1
+        if queue_task:
+            self.processing_queue.enqueue_task(reading, "historical_analysis")
+        return new_node
+
+    def remove_node(self, node: DoublyLinkedNode) -> None:
+        """Unlink a node in O(1)."""
+        if node.prev:
+            node.prev.next = node.next
+        else:
+            self.head = node.next
+        if node.next:
+            node.next.prev = node.prev
+        else:
+            self.tail = node.prev
+        node.prev = node.next = None
+        self.size -= 1
+
+class CircularEnergyQueue:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.queue = [None] * capacity
+        self.front = 0
+        self.rear = -1
+        self.size = 0
+        self.processing_queue = EnergyProcessingQueue()
+
+    def enqueue(self, reading: EnergyReading, queue_task: bool = True) -> bool:
+        if self.is_full():
+            return False
+            
+        self.rear = (self.rear + 1) % self.capacity
+        self.queue[self.rear] = reading
+        self.size += 1
+        # Queue reading for processing
+        if queue_task:
+            self.processing_queue.enqueue_task(reading, "recent_analysis")
+        return True
+
+    def is_full(self) -> bool:
+        return self.size == self.capacity
+
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+def reading_sort_key(reading: EnergyReading) -> Tuple[datetime, str]:
+    """Order of range query results: by timestamp, then device id."""
+    return reading.timestamp, reading.device_id
+
+# Task types that subscribe to every reading added through EnergyTrackingSystem
+SUBSCRIBER_TASK_TYPES = ("consumption_analysis", "historical_analysis", "recent_analysis", "system_analysis")
+READING_TASK_TYPE = "reading"
+
+class EnergyTrackingSystem:
+    def __init__(self, recent_readings_capacity: int = 24, wal=None,
+                 handlers: Optional[TaskHandlerRegistry] = None, dispatch_batch_size: int = 1024,
+                 query_cache_entries: int = 1024, columnar_history: bool = False,
+                 forecasting: bool = False, reorder_lateness: Optional[timedelta] = None,
+                 reorder_max_buffered: int = 100_000, dedup_window: Optional[timedelta] = None,
+                 dedup_false_positive_rate: float = 0.001, compressed_history: bool = False,
+                 alert_rules: bool = False, thread_safe: bool = False,
+                 compressed_resolution: timedelta = timedelta(seconds=1)):
+        self.hierarchy = EnergyHierarchyTree()
+        # Optional locking for concurrent ingest and queries (see energy_tracker.concurrency)
+        self.thread_safe = thread_safe
+        self.zone_tree_lock = None
+        self.zone_locks = None
+        self.shared_lock = nullcontext()
+        # Held from a reorder push until its released readings are ingested, so two
+        # threads cannot interleave their releases out of timestamp order
+        self.release_lock = nullcontext()
+        # Serialises process_all_pending, whose queues stage partial batches between calls
+        self.drain_lock = nullcontext()
+        self.epoch = 0
+        if thread_safe:
+            import threading
+            from .concurrency import ReadWriteLock, ZoneLocks
+            self.zone_tree_lock = ReadWriteLock()
+            self.zone_locks = ZoneLocks()
+            self.shared_lock = threading.Lock()
+            self.release_lock = threading.Lock()
+            self.drain_lock = threading.Lock()
+        # Optional suppression of repeated (device_id, timestamp) readings
+        self.dedup = None
+        if dedup_window is not None:
+            from .dedup import DuplicateFilter
+            self.dedup = DuplicateFilter(dedup_window, false_positive_rate=dedup_false_positive_rate)
+        # Optional columnar copy of every reading for energy_tracker.analytics group-bys
+        self.columns = None
+        if columnar_history:
+            from .analytics import ReadingColumns
+            self.columns = ReadingColumns()
+        # Optional Gorilla-compressed history (see energy_tracker.compression). Readings
+        # leave the raw history list once their chunk is sealed; until then their
+        # nodes wait here, per (device_id, reading_type) series.
+        self.compressed = None
+        self.unsealed: Dict[Tuple[str, str], List[DoublyLinkedNode]] = {}
+        if compressed_history:
+            from .compression import CompressedHistory
+            self.compressed = CompressedHistory(resolution=compressed_resolution)
+        # Optional threshold and energy-saving goal alerts (see energy_tracker.rules)
+        self.rules = None
+        if alert_rules:
+            from .rules import RuleEngine
+            self.rules = RuleEngine()
+        # Optional per-device and per-zone online forecasts
+        self.forecaster = None
+        if forecasting:
+            from .forecasting import ForecastEngine
+            self.forecaster = ForecastEngine()
+        # Optional watermarked reorder stage so history is ingested in timestamp order
+        self.reorder = None
+        if reorder_lateness is not None:
+            from .reorder import ReorderBuffer
+            self.reorder = ReorderBuffer(reorder_lateness, reorder_max_buffered)
+        self.query_cache = QueryCache(query_cache_entries)
+        self.history = EnergyConsumptionList()
+        self.ingested = 0  # readings ever ingested; the history may hold fewer
+        self.recent = CircularEnergyQueue(recent_readings_capacity)
+        self.handlers = handlers if handlers is not None else task_handlers
+        # Each reading becomes a single task that every subscriber handler shares
+        dispatch = TaskHandlerRegistry()
+        dispatch.register(READING_TASK_TYPE, self._dispatch_to_subscribers, batch_size=dispatch_batch_size)
+        self.main_processing_queue = EnergyProcessingQueue(wal, dispatch)
+
+    def _dispatch_to_subscribers(self, tasks: List[ProcessingTask]) -> None:
+        for task_type in SUBSCRIBER_TASK_TYPES:
+            entry = self.handlers.get(task_type)
+            if entry is None:
+                continue
+            for start in range(0, len(tasks), entry.batch_size):
+                batch = tasks[start:start + entry.batch_size]
+                try:
+                    entry.handler(batch)
+                except Exception as exc:
+                    # Recorded per subscriber, so one failing handler neither fails the
+                    # shared task nor stops the subscribers after it. The task is not
+                    # marked complete in the WAL, so after a restart it is dispatched
+                    # again to every subscriber.
+                    error = repr(exc)
+                    for task in batch:
+                        if task.subscriber_errors is None:
+                            task.subscriber_errors = {}
+                        task.subscriber_errors[task_type] = error
+                    if metrics.enabled:
+                        metrics.inc("energy_tasks_failed_total", len(batch), task_type=task_type)
+
+    def add_zone(self, zone_name: str, parent_name: str) -> bool:
+        """Add a zone under parent_name; use this rather than hierarchy.add_zone when thread-safe."""
+        if self.zone_tree_lock is None:
+            return self.hierarchy.add_zone(zone_name, parent_name)
+        with self.zone_tree_lock.write():
+            return self.hierarchy.add_zone(zone_name, parent_name)
+
+    def _zone_tree_shared(self):
+        """Shared hold on the zone tree, so no zone is added while it is held."""
+        return self.zone_tree_lock.read() if self.zone_tree_lock is not None else nullcontext()
+
+    def snapshot(self):
+        """Read-only view of every zone's readings and totals at one moment.
+
+        Costs O(zones); ingest only waits while the zones are copied, and the view
+        stays valid afterwards.
+        """
+        from .concurrency import take_snapshot
+        with self._zone_tree_shared():
+            with self.shared_lock:
+                self.epoch += 1
+                epoch = self.epoch
+            return take_snapshot(self, epoch)
+
+    def _snapshot_query(self, key: tuple, query, tags):
+        """Answer a thread-safe query from the cache or a fresh snapshot.
+
+        A result is only cached if no reading was ingested while the snapshot was
+        taken and queried.
+        """
+        with self.shared_lock:
+            cached = self.query_cache.get(key)
+            ingested = self.ingested
+        if cached is not None:
+            return cached
+        result = query(self.snapshot())
+        if result is not None:
+            with self.shared_lock:
+                if self.ingested == ingested:
+                    self.query_cache.put(key, result, tags)
+        return result
+
+    def add_reading(self, reading: EnergyReading, zone_name: str) -> bool:
+        """Add a reading to all data structures and queue it once for processing.
+
+        With a reorder buffer the reading may only be ingested once the watermark
+        passes it; readings later than that go through the correction path.
+        With duplicate suppression a repeated (device_id, timestamp) is dropped
+        and reported as not added. With a write-ahead log the reading's task is on
+        disk when this returns; the flush happens after the ingest locks are released.
+        """
+        with self._group_commit(), self._zone_tree_shared():
+            return self._add_reading(reading, zone_name)
+
+    def add_readings(self, readings: Iterable[Tuple[EnergyReading, str]]) -> int:
+        """Add (reading, zone_name) pairs and return how many were accepted.
+
+        With a write-ahead log the batch is made durable with one flush on return,
+        rather than one per reading. Readings still held by a reorder buffer are
+        not logged until they are released.
+        """
+        with self._group_commit():
+            return sum(self.add_reading(reading, zone_name) for reading, zone_name in readings)
+
+    def _group_commit(self):
+        wal = self.main_processing_queue.wal
+        return wal.group_commit() if wal is not None else nullcontext()
+
+    def flush(self) -> None:
+        """Block until every task accepted so far is on disk (no-op without a WAL)."""
+        if self.main_processing_queue.wal is not None:
+            self.main_processing_queue.wal.flush()
+
+    def checkpoint(self) -> None:
+        """Compact the write-ahead log down to the still-pending tasks (no-op without one)."""
+        if self.main_processing_queue.wal is not None:
+            self.main_processing_queue.wal.checkpoint()
+
+    def _add_reading(self, reading: EnergyReading, zone_name: str) -> bool:
+        started = perf_counter() if metrics.enabled else None
+        if zone_name not in self.hierarchy.node_map:
+            accepted = False
+        elif self.dedup is not None and self._is_duplicate(reading):
+            if metrics.enabled:
+                metrics.inc("energy_readings_duplicate_total")
+            return False
+        elif self.reorder is None:
+            accepted = self._ingest(reading, zone_name)
+        else:
+            with self.release_lock:
+                with self.shared_lock:
+                    released, late = self.reorder.push(reading, zone_name)
+                for ready_reading, ready_zone in released:
+                    self._ingest(ready_reading, ready_zone)
+                for late_reading, late_zone in late:
+                    self._ingest(late_reading, late_zone, late=True)
+            accepted = True
+        if started is not None:
+            if accepted:
+                metrics.inc("energy_readings_ingested_total")
+                metrics.observe("energy_add_reading_seconds", perf_counter() - started)
+            else:
+                metrics.inc("energy_readings_rejected_total")
+        return accepted
+
+    def _is_duplicate(self, reading: EnergyReading) -> bool:
+        with self.shared_lock:
+            return self.dedup.check_and_add(reading)
+
+    def flush_reorder_buffer(self) -> int:
+        """Ingest every reading still held back by the reorder buffer."""
+        if self.reorder is None:
+            return 0
+        with self._group_commit(), self._zone_tree_shared(), self.release_lock:
+            with self.shared_lock:
+                released = self.reorder.flush()
+            for reading, zone_name in released:
+                self._ingest(reading, zone_name)
+        return len(released)
+
+    def _ingest(self, reading: EnergyReading, zone_name: str, late: bool = False) -> bool:
+        if self.zone_locks is None:
+            if not self.hierarchy.add_reading_to_zone(zone_name, reading, queue_task=False):
+                return False
+        else:
+            with self.zone_locks.get(zone_name):
+                if not self.hierarchy.add_reading_to_zone(zone_name, reading, queue_task=False):
+                    return False
+        with self.shared_lock:
+            self._ingest_shared(reading, zone_name, late)
+        return True
+
+    def _ingest_shared(self, reading: EnergyReading, zone_name: str, late: bool) -> None:
+        """Update the history, recent window and optional indexes for an ingested reading."""
+        if late:
+            # Correction path: keep history time-ordered and leave the recent window
+            # alone, since the reading is older than what it already holds.
+            node = self.history.insert_in_order(reading, queue_task=False)
+            if metrics.enabled:
+                metrics.inc("energy_readings_late_total")
+        else:
+            node = self.history.add_reading(reading, queue_task=False)
+            self.recent.enqueue(reading, queue_task=False)
+        self.ingested += 1
+        self.main_processing_queue.enqueue_task(reading, READING_TASK_TYPE, zone_name)
+        if self.columns is not None:
+            self.columns.append(reading, zone_name)
+        if self.compressed is not None:
+            key = (reading.device_id, reading.reading_type)
+            unsealed = self.unsealed.get(key)
+            if unsealed is None:
+                unsealed = self.unsealed[key] = []
+            unsealed.append(node)
+            if self.compressed.append(reading):
+                # The sealed chunk now holds exactly these readings
+                for sealed in unsealed:
+                    self.history.remove_node(sealed)
+                unsealed.clear()
+        if self.query_cache.entries or self.forecaster is not None or self.rules:
+            zone_path = self.hierarchy.zone_path(zone_name)
+            if self.forecaster is not None:
+                self.forecaster.observe(reading, zone_path)
+            if self.rules:
+                for alert in self.rules.evaluate(reading, zone_path, zone_name):
+                    if metrics.enabled:
+                        metrics.inc("energy_alerts_total", priority=alert.priority.name)
+            if self.query_cache.entries:
+                self.query_cache.invalidate(reading_tags(zone_path, reading.timestamp))
+
+    def process_all_pending(self) -> dict:
+        """Process all pending tasks across the system.
+
+        Concurrent calls on a thread-safe system run one at a time.
+        """
+        with self.drain_lock:
+            return self._process_all_pending()
+
+    def _process_all_pending(self) -> dict:
+        results = {
+            'system': [],
+            'zones': {},
+        }
+        
+        # Process the shared reading tasks, then group them by zone
+        results['system'] = self.main_processing_queue.process_batches(flush=True)
+        for task in results['system']:
+            results['zones'].setdefault(task.zone_name, []).append(task)
+        
+        # Process tasks queued directly on zones through the hierarchy
+        for zone_name in list(self.hierarchy.node_map):
+            if metrics.enabled:
+                started = perf_counter()
+                processed = self.hierarchy.process_zone_readings(zone_name)
+                metrics.observe("energy_zone_drain_seconds", perf_counter() - started, zone=zone_name)
+                metrics.set_gauge("energy_zone_drained_tasks",
+                                  len(processed) + len(results['zones'].get(zone_name, ())), zone=zone_name)
+            else:
+                processed = self.hierarchy.process_zone_readings(zone_name)
+            if processed:
+                results['zones'].setdefault(zone_name, []).extend(processed)
+        
+        return results
+
+    def get_zone_total(self, zone_name: str, include_children: bool = True) -> Optional[float]:
+        """Total consumption of a zone, by default including every zone below it."""
+        key = ("zone_total", zone_name, include_children)
+        if self.thread_safe:
+            # Read a snapshot rather than the live tree
+            return self._snapshot_query(key, lambda snapshot: snapshot.get_zone_total(zone_name, include_children),
+                                        [("zone", zone_name)])
+        if zone_name not in self.hierarchy.node_map:
+            return None
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            return cached
+
+        node = self.hierarchy.node_map[zone_name]
+        if not include_children:
+            total = node.total_consumption
+        else:
+            total, stack = 0.0, [node]
+            while stack:
+                current = stack.pop()
+                total += current.total_consumption
+                stack.extend(current.children)
+        self.query_cache.put(key, total, [("zone", zone_name)])
+        return total
+
+    def get_readings_between(self, start: datetime, end: datetime) -> List[EnergyReading]:
+        """Readings in the history with start <= timestamp < end, by timestamp then device id.
+
+        Thread-safe systems answer from a snapshot and return the same order. With
+        compressed history, readings from sealed chunks are decoded copies: their
+        priority is the default and timestamps are at the compression resolution.
+        """
+        key = ("readings_between", start, end)
+        if self.thread_safe:
+            return list(self._snapshot_query(key, lambda snapshot: snapshot.get_readings_between(start, end),
+                                             day_tags(start, end)))
+        cached = self.query_cache.get(key)
+        if cached is None:
+            cached = []
+            current = self.history.head
+            while current:
+                if start <= current.reading.timestamp < end:
+                    cached.append(current.reading)
+                current = current.next
+            if self.compressed is not None:
+                cached.extend(self.compressed.readings(start, end, sealed_only=True))
+            cached.sort(key=reading_sort_key)
+            self.query_cache.put(key, cached, day_tags(start, end))
+        return list(cached)
+
+    def get_top_devices(self, n: int = 10, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> List[Tuple[str, float]]:
+        """Devices with the highest consumption, optionally within [start, end)."""
+        key = ("top_devices", n, start, end)
+        if self.thread_safe:
+            bounded = start is not None and end is not None
+            return list(self._snapshot_query(key, lambda snapshot: snapshot.get_top_devices(n, start, end),
+                                             day_tags(start, end) if bounded else [ALL_TAG]))
+        cached = self.query_cache.get(key)
+        if cached is None:
+            # Sealed chunks answer from their summaries; only the raw tail is walked
+            totals = self.compressed.device_totals(start, end, sealed_only=True) if self.compressed is not None else {}
+            current = self.history.head
+            while current:
+                reading = current.reading
+                if (start is None or reading.timestamp >= start) and (end is None or reading.timestamp < end):
+                    totals[reading.device_id] = totals.get(reading.device_id, 0.0) + reading.consumption
+                current = current.next
+            cached = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+            bounded = start is not None and end is not None
+            self.query_cache.put(key, cached, day_tags(start, end) if bounded else [ALL_TAG])
+        return list(cached)
+
+    def group_by(self, by: str, agg: str = "sum", **options) -> dict:
+        """Vectorised consumption totals per hour, day, month, device, zone or reading type.
+
+        See energy_tracker.analytics.ReadingColumns.group_by for the options. Uses the
+        columnar history when enabled, otherwise builds the columns from the zones.
+        """
+        from .analytics import ReadingColumns
+        with self._zone_tree_shared(), self.shared_lock:
+            columns = self.columns if self.columns is not None else ReadingColumns.from_system(self)
+            return columns.group_by(by, agg, **options)
+
+    def forecast(self, zone_name: Optional[str] = None, device_id: Optional[str] = None,
+                 hours: int = 1) -> Optional[List[float]]:
+        """Hourly consumption forecasts for a zone (including sub-zones) or a device.
+
+        Requires forecasting=True. The first value is for the hour currently being
+        filled by incoming readings.
+        """
+        if self.forecaster is None:
+            return None
+        with self.shared_lock:
+            if device_id is not None:
+                return self.forecaster.forecast("device", device_id, hours)
+            return self.forecaster.forecast("zone", zone_name or self.hierarchy.root.name, hours)
+
+    def next_alert(self):
+        """Pop the most urgent queued alert, or None. Requires alert_rules=True."""
+        if self.rules is None:
+            return None
+        with self.shared_lock:
+            return self.rules.next_alert()
+
+    def drain_alerts(self) -> list:
+        """Pop every queued alert, most urgent first.
+
+        Call this (or next_alert) regularly: alerts beyond rules.max_alerts are
+        dropped, least urgent first.
+        """
+        if self.rules is None:
+            return []
+        with self.shared_lock:
+            return self.rules.drain_alerts()
+
+    def memory_report(self, sample: int = 64) -> Dict[str, Any]:
+        """Estimated deep memory in bytes per component and per zone.
+
+        Readings are shared by the history, zones and recent window, so they are
+        counted once under "readings" and left out of every other figure. Large
+        containers are sampled (see energy_tracker.memory), so this is cheap enough
+        to run on a live system.
+        """
+        import sys
+        from .memory import chain_sizeof, deep_sizeof
+        stop = (EnergyReading, EnergyTreeNode, DoublyLinkedNode)
+        with self._zone_tree_shared(), self.shared_lock:
+            # Every ingested reading stays in its zone, while the history may have
+            # handed older ones over to compressed chunks
+            reading_lists = [node.readings for node in self.hierarchy.node_map.values()]
+            shells = sys.getsizeof(reading_lists) + sum(sys.getsizeof(readings) for readings in reading_lists)
+            readings = {"count": sum(len(readings) for readings in reading_lists),
+                        "bytes": deep_sizeof(reading_lists, sample) - shells}
+            _, history_nodes = chain_sizeof(self.history.head, self.history.size, "reading", sample,
+                                            stop=(EnergyReading,))
+            components = {
+                "history": deep_sizeof(self.history, sample, stop) + history_nodes,
+                "recent": deep_sizeof(self.recent, sample, stop),
+                "processing_queue": deep_sizeof(self.main_processing_queue, sample, stop),
+                "hierarchy": deep_sizeof(self.hierarchy, sample, stop),
+                "query_cache": deep_sizeof(self.query_cache, sample, stop),
+            }
+            for name in ("columns", "compressed", "forecaster", "rules", "dedup", "reorder"):
+                component = getattr(self, name)
+                if component is not None:
+                    components[name] = deep_sizeof(component, sample, stop)
+            zones = {
+                zone_name: {"readings": len(node.readings), "bytes": deep_sizeof(node, sample, stop)}
+                for zone_name, node in self.hierarchy.node_map.items()
+            }
+        total = readings["bytes"] + sum(components.values()) + sum(zone["bytes"] for zone in zones.values())
+        return {"total": total, "readings": readings, "components": components, "zones": zones}
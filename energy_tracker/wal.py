@@ -0,0 +1,359 @@
+"""Segmented write-ahead log that makes EnergyProcessingQueue crash safe.
+
+Every enqueued task is logged before it becomes visible in the queue and a
+completion record is logged when it is processed. Appends encode the record
+into an in-memory batch; a background thread writes each batch and issues one
+fsync for all of it (group commit).
+
+Durability contract: by default (``wait_for_commit=True``) an enqueue returns
+only once its record is on disk, so every task the queue accepted survives a
+crash; concurrent enqueues share an fsync. Inside ``group_commit()`` enqueues
+return at once and the block ends with one ``flush()``, so a batch is durable
+when the block exits. With ``wait_for_commit=False`` enqueues return before
+the fsync and a crash can lose the last ``commit_interval`` of accepted tasks
+unless ``flush()`` was called. Completion records are always asynchronous: a
+lost one only means the task runs again after a restart.
+
+Segment file names increase monotonically with the log. Sealed segments
+whose tasks have all completed are deleted as soon as they reach the front of
+the log; ``checkpoint()`` additionally carries still-pending tasks forward so
+every older segment can be truncated.
+
+Timestamps are logged as wall-clock microseconds plus the UTC offset in
+seconds, so naive readings replay unchanged and aware ones come back with a
+fixed-offset tzinfo for the same instant, even inside a DST fold. A record
+whose checksum (over its kind and payload) fails or which cannot be decoded
+is treated as a torn tail and dropped along with everything after it.
+"""
+
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .tracking import EnergyReading, Priority
+
+# payload length, crc32 of kind and payload, record kind
+RECORD_HEADER = struct.Struct("<IIB")
+ENQUEUE = 1
+COMPLETE = 2
+# sequence, wall-clock microseconds since 1970-01-01, UTC offset in seconds, consumption, priority
+ENQUEUE_FIELDS = struct.Struct("<QqidB")
+NAIVE_OFFSET = -2 ** 31  # UTC offset field of a naive timestamp
+EPOCH = datetime(1970, 1, 1)
+SEQUENCE = struct.Struct("<Q")
+STRING_LENGTH = struct.Struct("<H")
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+
+# (sequence, reading, task_type, zone_name)
+RecoveredTask = Tuple[int, EnergyReading, str, Optional[str]]
+
+
+def _encode_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def _decode_string(payload: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = STRING_LENGTH.unpack_from(payload, offset)
+    offset += STRING_LENGTH.size
+    return payload[offset:offset + length].decode("utf-8"), offset + length
+
+
+def _checksum(kind: int, payload: bytes) -> int:
+    return zlib.crc32(payload, zlib.crc32(bytes((kind,))))
+
+
+def _record(kind: int, payload: bytes) -> bytes:
+    return RECORD_HEADER.pack(len(payload), _checksum(kind, payload), kind) + payload
+
+
+def encode_timestamp(timestamp: datetime) -> Tuple[int, int]:
+    """(wall-clock microseconds since 1970-01-01, UTC offset in seconds or NAIVE_OFFSET)."""
+    utc_offset = timestamp.utcoffset()
+    micros = (timestamp.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1)
+    return micros, NAIVE_OFFSET if utc_offset is None else utc_offset // timedelta(seconds=1)
+
+
+def decode_timestamp(micros: int, utc_offset: int) -> datetime:
+    """Rebuild a timestamp from encode_timestamp, with a fixed-offset tzinfo if it was aware."""
+    timestamp = EPOCH + timedelta(microseconds=micros)
+    if utc_offset == NAIVE_OFFSET:
+        return timestamp
+    return timestamp.replace(tzinfo=timezone(timedelta(seconds=utc_offset)))
+
+
+def encode_enqueue(sequence: int, reading: EnergyReading, task_type: str,
+                   zone_name: Optional[str] = None) -> bytes:
+    micros, utc_offset = encode_timestamp(reading.timestamp)
+    payload = (
+        ENQUEUE_FIELDS.pack(sequence, micros, utc_offset, reading.consumption, reading.priority.value)
+        + _encode_string(reading.device_id)
+        + _encode_string(reading.reading_type)
+        + _encode_string(task_type)
+        + _encode_string(zone_name or "")
+    )
+    return _record(ENQUEUE, payload)
+
+
+def decode_enqueue(payload: bytes) -> Tuple[int, EnergyReading, str, Optional[str]]:
+    sequence, micros, utc_offset, consumption, priority = ENQUEUE_FIELDS.unpack_from(payload, 0)
+    offset = ENQUEUE_FIELDS.size
+    device_id, offset = _decode_string(payload, offset)
+    reading_type, offset = _decode_string(payload, offset)
+    task_type, offset = _decode_string(payload, offset)
+    zone_name, offset = _decode_string(payload, offset)
+    reading = EnergyReading(
+        timestamp=decode_timestamp(micros, utc_offset),
+        consumption=consumption,
+        device_id=device_id,
+        reading_type=reading_type,
+        priority=Priority(priority),
+    )
+    return sequence, reading, task_type, zone_name or None
+
+
+def _fsync_directory(directory: str) -> None:
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024,
+                 commit_interval: float = 0.005, wait_for_commit: bool = True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commit_interval = commit_interval
+        self.wait_for_commit = wait_for_commit
+        self.grouped = threading.local()  # group_commit() nesting depth of each thread
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.committed = threading.Condition(self.lock)
+        self.io_lock = threading.Lock()
+        self.batch: List[Tuple[int, int, bytes]] = []  # (kind, sequence, record)
+        self.last_sequence = 0
+        self.durable_sequence = 0
+        self.waiters = 0  # appends blocked in _wait_durable
+        self.closed = False
+
+        # Bookkeeping below is only touched while holding io_lock
+        self.segments: List[int] = []  # names of every live segment, oldest first
+        self.segment_outstanding: Dict[int, int] = {}
+        self.outstanding: Dict[int, Tuple[int, bytes]] = {}  # sequence -> (segment, record)
+        self.recovered = self._replay()
+
+        self.file = None
+        self._open_segment(max([self.last_sequence + 1] + self.segments))
+        self.flusher = threading.Thread(target=self._flush_loop, name="energy-wal-flusher", daemon=True)
+        self.flusher.start()
+
+    def _segment_path(self, name: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{name:020d}{SEGMENT_SUFFIX}")
+
+    def _existing_segments(self) -> List[int]:
+        return sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _replay(self) -> List[RecoveredTask]:
+        """Rebuild the set of tasks that were enqueued but never completed."""
+        pending: Dict[int, Tuple[EnergyReading, str, Optional[str]]] = {}
+        for name in self._existing_segments():
+            path = self._segment_path(name)
+            with open(path, "rb") as segment:
+                data = segment.read()
+            offset = 0
+            while offset + RECORD_HEADER.size <= len(data):
+                length, checksum, kind = RECORD_HEADER.unpack_from(data, offset)
+                payload = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+                if len(payload) != length or _checksum(kind, payload) != checksum:
+                    break
+                try:
+                    if kind == ENQUEUE:
+                        sequence, reading, task_type, zone_name = decode_enqueue(payload)
+                    elif kind == COMPLETE:
+                        (sequence,) = SEQUENCE.unpack(payload)
+                    else:
+                        break
+                except (struct.error, UnicodeDecodeError, ValueError, OverflowError):
+                    break
+                record = data[offset:offset + RECORD_HEADER.size + length]
+                offset += RECORD_HEADER.size + length
+                if kind == ENQUEUE:
+                    pending[sequence] = (reading, task_type, zone_name)
+                    self.outstanding[sequence] = (name, record)
+                else:
+                    pending.pop(sequence, None)
+                    self.outstanding.pop(sequence, None)
+                self.last_sequence = max(self.last_sequence, sequence)
+            if offset < len(data):
+                # Torn write from a crash: drop the incomplete or undecodable tail
+                with open(path, "r+b") as segment:
+                    segment.truncate(offset)
+            self.segments.append(name)
+            self.segment_outstanding[name] = 0
+
+        for segment, _ in self.outstanding.values():
+            self.segment_outstanding[segment] += 1
+        self.durable_sequence = self.last_sequence
+        return [(sequence,) + entry for sequence, entry in sorted(pending.items())]
+
+    def take_recovered(self) -> List[RecoveredTask]:
+        """Hand the replayed pending tasks to the queue that owns this log, once."""
+        recovered, self.recovered = self.recovered, []
+        return recovered
+
+    def _open_segment(self, name: int) -> None:
+        """Seal the current segment and continue in the named one.
+
+        Segment names only need to increase; replay truncates any torn tail, so
+        appending to an existing segment always starts at a record boundary.
+        """
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+        self.file = open(self._segment_path(name), "ab")
+        if name not in self.segment_outstanding:
+            self.segments.append(name)
+            self.segment_outstanding[name] = 0
+            _fsync_directory(self.directory)
+        self.current_segment = name
+
+    def _next_segment_name(self) -> int:
+        with self.lock:
+            return max(self.last_sequence + 1, self.current_segment + 1)
+
+    def append_enqueue(self, reading: EnergyReading, task_type: str, zone_name: Optional[str] = None) -> int:
+        """Log a new task and return its sequence number."""
+        with self.lock:
+            self.last_sequence += 1
+            sequence = self.last_sequence
+            self.batch.append((ENQUEUE, sequence, encode_enqueue(sequence, reading, task_type, zone_name)))
+            if self.wait_for_commit and not getattr(self.grouped, "depth", 0):
+                # Wake the flusher now rather than after its commit interval
+                self.committed.notify_all()
+                self._wait_durable(sequence)
+        return sequence
+
+    @contextmanager
+    def group_commit(self):
+        """Let this thread's enqueues return at once and flush them together on exit."""
+        self.grouped.depth = getattr(self.grouped, "depth", 0) + 1
+        try:
+            yield self
+        finally:
+            self.grouped.depth -= 1
+            if not self.grouped.depth:
+                self.flush()
+
+    def append_complete(self, sequence: int) -> None:
+        """Log that a task has been processed."""
+        with self.lock:
+            self.batch.append((COMPLETE, sequence, _record(COMPLETE, SEQUENCE.pack(sequence))))
+
+    def _wait_durable(self, sequence: int) -> None:
+        # Called with self.lock held
+        self.waiters += 1
+        try:
+            while self.durable_sequence < sequence and not self.closed:
+                self.committed.wait()
+        finally:
+            self.waiters -= 1
+
+    def flush(self) -> None:
+        """Block until everything appended so far is on disk."""
+        self._commit()
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self.lock:
+                if self.closed:
+                    return
+                # Appends queued while the last batch was written go out at once if
+                # someone is blocked on them
+                if not (self.batch and self.waiters):
+                    self.committed.wait(self.commit_interval)
+            self._commit()
+
+    def _commit(self) -> None:
+        with self.io_lock:
+            with self.lock:
+                batch, self.batch = self.batch, []
+                target = self.last_sequence
+            if batch:
+                self._write(batch)
+            with self.lock:
+                self.durable_sequence = max(self.durable_sequence, target)
+                self.committed.notify_all()
+
+    def _write(self, batch: List[Tuple[int, int, bytes]]) -> None:
+        # Called with io_lock held
+        data = []
+        for kind, sequence, record in batch:
+            if kind == ENQUEUE:
+                self.outstanding[sequence] = (self.current_segment, record)
+                self.segment_outstanding[self.current_segment] += 1
+            else:
+                entry = self.outstanding.pop(sequence, None)
+                if entry is not None:
+                    self.segment_outstanding[entry[0]] -= 1
+            data.append(record)
+        self.file.write(b"".join(data))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        if self.file.tell() >= self.segment_bytes:
+            self._open_segment(self._next_segment_name())
+        self._truncate_completed()
+
+    def _truncate_completed(self) -> None:
+        """Delete sealed segments at the front of the log with no outstanding tasks."""
+        removed = False
+        while len(self.segments) > 1 and self.segment_outstanding[self.segments[0]] == 0:
+            name = self.segments.pop(0)
+            del self.segment_outstanding[name]
+            os.remove(self._segment_path(name))
+            removed = True
+        if removed:
+            _fsync_directory(self.directory)
+
+    def checkpoint(self) -> None:
+        """Carry outstanding tasks into a fresh segment and delete every older one."""
+        self._commit()
+        with self.io_lock:
+            self._open_segment(self._next_segment_name())
+            carried = sorted(self.outstanding.items())
+            self.file.write(b"".join(record for _, (_, record) in carried))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            for sequence, (_, record) in carried:
+                self.outstanding[sequence] = (self.current_segment, record)
+            for segment in self.segments:
+                self.segment_outstanding[segment] = 0
+            self.segment_outstanding[self.current_segment] = len(carried)
+            self._truncate_completed()
+
+    def segment_count(self) -> int:
+        return len(self.segments)
+
+    def close(self) -> None:
+        self._commit()
+        with self.lock:
+            self.closed = True
+            self.committed.notify_all()
+        self.flusher.join()
+        with self.io_lock:
+            self.file.close()